@@ -1,11 +1,151 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 import json
-from financial_engine import compute_financials
-from reasonability import evaluate_reasonability
+from financial_engine import (
+    ENGINE_VERSION,
+    SCALE_KEYS,
+    YEARS,
+    baseline_key,
+    compute_financials,
+    compute_financials_batch,
+    get_baseline,
+    load_baseline_workbook,
+    normalized_params,
+    shared_baseline,
+)
+from cohorts import cohort_matrix
+from comparison import DEFAULT_SERIES as COMPARE_SERIES, compare_scenarios as run_comparison
+from encoding import encode_array, format_results, parse_format
+from reasonability import (
+    COLORS,
+    decode_colors,
+    evaluate_reasonability,
+    evaluate_reasonability_batch,
+    get_rules,
+    load_rules,
+)
+from goal_seek import goal_seek as solve_goal
+from http_caching import (
+    choose_coding,
+    compress,
+    etag,
+    query_params,
+    representation_etag,
+    representation_etags,
+)
+import instrumentation
+from live_session import SessionManager
+from monte_carlo import run_monte_carlo
+from monthly import compute_financials_monthly, monthly_baseline, seasonality_key
+from result_cache import ResultCache
+from scenario_results import color_label, materialize, stored_version
+from scenario_store import SUMMARY_FIELDS, ScenarioStore
+from metrics import metric_names, to_json_list
+from model_spec import model_spec as build_model_spec, spec_key
+from sensitivity import DEFAULT_OUTPUTS, run_sensitivity
+from sweep import DEFAULT_OUTPUTS as SWEEP_OUTPUTS, sweep_axes, sweep_chunks
+from valuation import valuation, valuation_options
 import os
+import threading
+import time
 
 app = Flask(__name__)
 
+result_cache = ResultCache(maxsize=int(os.environ.get("RESULT_CACHE_SIZE", "1024")))
+
+# Serialized (and compressed) /run_model and /model_spec bodies by ETag,
+# and how long clients may reuse them before revalidating
+response_cache = ResultCache(maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", "1024")))
+RUN_MODEL_MAX_AGE = int(os.environ.get("RUN_MODEL_MAX_AGE", "60"))
+
+MAX_BATCH_SCENARIOS = 100_000
+MAX_MONTE_CARLO_DRAWS = 1_000_000
+MAX_SWEEP_POINTS = 4_000_000
+
+# Memory grows with scenarios × periods, so longer horizons lower the
+# scenario caps: the budgets match the caps above at the sheet's 14 years
+MAX_BATCH_CELLS = MAX_BATCH_SCENARIOS * len(YEARS)
+MAX_MONTE_CARLO_CELLS = MAX_MONTE_CARLO_DRAWS * len(YEARS)
+MAX_SWEEP_CELLS = MAX_SWEEP_POINTS * len(YEARS)
+
+live_sessions = SessionManager(ttl=float(os.environ.get("LIVE_SESSION_TTL", "1800")))
+LIVE_HEARTBEAT_SECONDS = 15.0
+
+# Saved scenarios (see get_scenario_store); JSON files from the old
+# data/scenarios/ layout are imported when the store is first opened
+SCENARIO_DB = os.environ.get("SCENARIO_DB", "data/scenarios.db")
+LEGACY_SCENARIO_DIR = "data/scenarios"
+MAX_SCENARIO_PAGE = 1000
+MAX_COMPARE_SCENARIOS = 1000
+MAX_COMPARE_CELLS = MAX_COMPARE_SCENARIOS * len(YEARS)
+
+MATERIALIZE_CHUNK = 10_000
+
+_scenario_store = None
+_scenario_store_lock = threading.Lock()
+
+
+def get_scenario_store():
+    """
+    The scenario store, opened (and the legacy JSON directory imported) on
+    first use. Importing this module touches nothing on disk: under
+    `python app.py` pool workers re-import it as their main module.
+    """
+    global _scenario_store
+    with _scenario_store_lock:
+        if _scenario_store is None:
+            store = ScenarioStore(SCENARIO_DB)
+            if os.path.isdir(LEGACY_SCENARIO_DIR):
+                store.import_json_dir(LEGACY_SCENARIO_DIR, validate=baseline_key)
+            _scenario_store = store
+        return _scenario_store
+
+
+def _refresh_scenario_results():
+    """
+    Recompute results missing or stored by another engine, baseline or
+    rule set, batched. Scenarios with invalid parameters are skipped:
+    they stay without results (summary null in /scenarios) until they
+    are re-saved.
+    """
+    names = get_scenario_store().stale(stored_version())
+    for start in range(0, len(names), MATERIALIZE_CHUNK):
+        records = get_scenario_store().get_many(names[start:start + MATERIALIZE_CHUNK])
+        items = list(records.items())
+        computed = materialize([record["data"] for _, record in items], skip_invalid=True)
+        get_scenario_store().save_results(
+            (name, materialized)
+            for (name, _), materialized in zip(items, computed)
+            if materialized is not None
+        )
+
+
+def _over_budget(count, baseline, max_cells, what):
+    """
+    413 response when count scenarios of `baseline` exceed max_cells periods,
+    else None. Monthly baselines have 12 periods a year, so the same budget
+    admits 12× fewer monthly scenarios than annual ones.
+    """
+    if count * baseline.periods <= max_cells:
+        return None
+    limit = max_cells // baseline.periods
+    message = f"At most {limit} {what} at a horizon of {baseline.periods} periods"
+    return jsonify({"error": message}), 413
+
+
+def _read_scenarios():
+    """
+    Parameter sets posted to the batch endpoints: a JSON array, an object
+    with a "scenarios" array, or an NDJSON body (one object per line).
+    """
+    if request.mimetype in ("application/x-ndjson", "application/ndjson"):
+        lines = request.get_data(as_text=True).splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("scenarios")
+    return data
+
 # -----------------------------
 # ROUTES
 # -----------------------------
@@ -16,18 +156,492 @@ def index():
 # -----------------------------
 # RUN MODEL
 # -----------------------------
-@app.route("/run_model", methods=["POST"])
+@app.route("/run_model", methods=["GET", "POST"])
 def run_model():
-    data = request.json
+    # GET takes the parameters from the query string (see http_caching.query_params)
+    data = (request.json or {}) if request.method == "POST" else query_params(request.args)
 
-    results = compute_financials(data)
-    reason = evaluate_reasonability(results)
+    try:
+        fmt = parse_format(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    granularity = data.get("granularity", "annual")
+    if granularity not in ("annual", "monthly"):
+        return jsonify({"error": "granularity must be 'annual' or 'monthly'"}), 400
+
+    def compute():
+        if granularity == "monthly":
+            results = compute_financials_monthly(data)
+        else:
+            results = compute_financials(data, debug_table=fmt.has_debug_table)
+        reason = evaluate_reasonability(results)
+        return {
+            "results": results,
+            "reasonability": reason
+        }
+
+    try:
+        key = (ENGINE_VERSION,) + normalized_params(data) + baseline_key(data)
+        if granularity == "monthly":
+            key += ("monthly", seasonality_key(data))
+        elif not fmt.has_debug_table:
+            key += ("no debug_table",)
+        options = valuation_options(data)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def render():
+        payload = result_cache.get_or_compute(key, compute)
+
+        # Cheap next to the model run, and depends on options outside the cache key
+        annual = payload["results"]
+        values = valuation({"years": annual["years"], "profit": [annual["profit"]]}, **options)
+        value = {name: to_json_list(column)[0] for name, column in values.items()}
+        if fmt.is_default:
+            return dict(payload, valuation=value)
+        return {
+            "results": format_results(payload["results"], fmt),
+            "reasonability": payload["reasonability"],
+            "valuation": value,
+        }
+
+    # The response is a pure function of these
+    tag = etag(key, sorted(options.items()), tuple(fmt), get_rules().fingerprint)
+    return _cached_json(tag, render)
+
+
+def _cached_json(tag, render):
+    """
+    Response for a body fully determined by `tag`: GET / HEAD revalidations
+    get a 304 before render() runs (a matched If-None-Match on a POST would
+    mean 412, not 304), bodies are cached serialized and compressed per
+    Accept-Encoding. ValueErrors of render() become 400s.
+    """
+    if request.method in ("GET", "HEAD"):
+        for known in representation_etags(tag):
+            if request.if_none_match.contains_weak(known):
+                response = app.response_class(status=304)
+                response.set_etag(known)
+                return _cacheable(response)
+
+    def serialize():
+        return app.json.dumps(render(), separators=(",", ":")).encode("utf-8")
+
+    try:
+        body = response_cache.get_or_compute(tag, serialize)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    offered = [coding for coding, quality in request.accept_encodings if quality > 0]
+    coding = choose_coding(offered, len(body))
+    if coding:
+        body = response_cache.get_or_compute((tag, coding), lambda: compress(body, coding))
+
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(representation_etag(tag, coding))
+    if coding:
+        response.headers["Content-Encoding"] = coding
+    return _cacheable(response)
+
+
+def _cacheable(response):
+    response.headers["Cache-Control"] = f"public, max-age={RUN_MODEL_MAX_AGE}"
+    response.vary.add("Accept-Encoding")
+    return response
+
+# -----------------------------
+# MODEL SPEC (local evaluation in the browser)
+# -----------------------------
+@app.route("/model_spec", methods=["GET"])
+def model_spec():
+    params = query_params(request.args)
+    try:
+        key = spec_key(params)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return _cached_json(etag("model_spec", key), lambda: build_model_spec(params))
 
+# -----------------------------
+# COHORTS
+# -----------------------------
+@app.route("/cohorts", methods=["POST"])
+def cohorts():
+    data = request.json or {}
+
+    try:
+        fmt = parse_format(request.args)
+        if data.get("granularity", "annual") == "monthly":
+            baseline = monthly_baseline(data)
+        else:
+            baseline = get_baseline(data)
+        mau_scale = normalized_params(data)[SCALE_KEYS.index("mau_scale")]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if baseline.retention is None:
+        return jsonify({"error": "A 'retention' curve is required for the cohort view"}), 400
+
+    new_users = mau_scale * baseline.coeff_new_users
     return jsonify({
-        "results": results,
-        "reasonability": reason
+        "periods": baseline.period_labels.tolist(),
+        "retention": baseline.retention.tolist(),
+        "new_users": encode_array(new_users, fmt),
+        "mau": encode_array(mau_scale * baseline.mau, fmt),
+        "matrix": encode_array(cohort_matrix(new_users, baseline.retention), fmt),
     })
 
+# -----------------------------
+# CACHE STATS
+# -----------------------------
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    # Repeat /run_model requests are answered from response_cache (serialized
+    # bodies) and only reach result_cache when the body is not cached
+    return jsonify(dict(result_cache.stats(), response_cache=response_cache.stats()))
+
+# -----------------------------
+# METRICS (Prometheus)
+# -----------------------------
+INSTRUMENTED_ENDPOINTS = {"run_model", "save_scenario", "load_scenario"}
+
+
+@app.before_request
+def _start_request_timer():
+    if instrumentation.METRICS_ENABLED and request.endpoint in INSTRUMENTED_ENDPOINTS:
+        g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        instrumentation.REQUEST_SECONDS.observe(
+            elapsed, request.endpoint, str(response.status_code)
+        )
+        if not response.is_streamed:
+            size = response.calculate_content_length() or 0
+            instrumentation.RESPONSE_BYTES.observe(size, request.endpoint)
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if not instrumentation.METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled (METRICS_ENABLED=0)"}), 404
+
+    extra = []
+    for prefix, label, cache in (
+        ("result_cache", "Result cache", result_cache),
+        ("response_cache", "Response body cache", response_cache),
+    ):
+        stats = cache.stats()
+        for name in ("hits", "misses", "evictions"):
+            extra += instrumentation.render_samples(
+                f"{prefix}_{name}_total", "counter", f"{label} {name}.", [({}, stats[name])]
+            )
+        for name in ("size", "maxsize"):
+            extra += instrumentation.render_samples(
+                f"{prefix}_{name}", "gauge", f"{label} {name}.", [({}, stats[name])]
+            )
+    return Response(instrumentation.render(extra), mimetype="text/plain; version=0.0.4")
+
+# -----------------------------
+# RUN BATCH
+# -----------------------------
+@app.route("/run_batch", methods=["POST"])
+def run_batch():
+    try:
+        fmt = parse_format(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    try:
+        scenarios = _read_scenarios()
+    except ValueError:
+        return jsonify({"error": "Invalid NDJSON body"}), 400
+
+    if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+        return jsonify({"error": "Expected a list of parameter objects"}), 400
+    if len(scenarios) > MAX_BATCH_SCENARIOS:
+        return jsonify({"error": f"At most {MAX_BATCH_SCENARIOS} scenarios per batch"}), 413
+
+    try:
+        baseline = shared_baseline(scenarios)
+        options = valuation_options(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    too_large = _over_budget(len(scenarios), baseline, MAX_BATCH_CELLS, "scenarios per batch")
+    if too_large:
+        return too_large
+
+    batch = compute_financials_batch(scenarios, baseline)
+    values = {name: to_json_list(column) for name, column in valuation(batch, **options).items()}
+    years = batch["years"].tolist()
+    series = {key: values for key, values in batch.items() if key != "years"}
+
+    reason = {
+        metric: decode_colors(codes)
+        for metric, codes in evaluate_reasonability_batch(batch).items()
+    }
+
+    if fmt.is_default:
+        series = {key: values.tolist() for key, values in series.items()}
+    else:
+        try:
+            series = format_results(series, fmt)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+    return jsonify({
+        "years": years,
+        "count": len(scenarios),
+        "results": series,
+        "reasonability": reason,
+        "valuation": values,
+    })
+
+# -----------------------------
+# REASONABILITY RULES
+# -----------------------------
+@app.route("/reasonability_rules", methods=["GET"])
+def reasonability_rules():
+    return jsonify(get_rules().spec)
+
+
+@app.route("/reasonability_rules/reload", methods=["POST"])
+def reload_reasonability_rules():
+    try:
+        rules = load_rules()
+    except (OSError, KeyError, TypeError, ValueError) as exc:
+        return jsonify({"error": f"Could not load rules: {exc}"}), 400
+
+    # Cached /run_model responses embed colors from the previous rules;
+    # stored scenario results go stale with them (see stored_version)
+    result_cache.clear()
+    response_cache.clear()
+    return jsonify({"status": "ok", "version": rules.version, "metrics": sorted(rules.metrics)})
+
+# -----------------------------
+# BASELINE WORKBOOK
+# -----------------------------
+@app.route("/baseline/reload", methods=["POST"])
+def reload_baseline():
+    # Re-reads BASELINE_WORKBOOK; an unchanged workbook maps its compiled cache
+    try:
+        source = load_baseline_workbook()
+    except (OSError, ValueError) as exc:
+        return jsonify({"error": f"Could not load baseline workbook: {exc}"}), 400
+
+    # Cache keys include the source, so old entries are only dead weight.
+    # Pool jobs carry their own baseline rows: running ones finish on the
+    # baseline they started with and the pool keeps serving new ones
+    result_cache.clear()
+    response_cache.clear()
+    return jsonify({"status": "ok", "source": source})
+
+# -----------------------------
+# MONTE CARLO
+# -----------------------------
+@app.route("/monte_carlo", methods=["POST"])
+def monte_carlo():
+    data = request.json or {}
+
+    try:
+        draws = int(data.get("draws", 100_000))
+        seed = data.get("seed")
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError):
+        return jsonify({"error": "'draws' and 'seed' must be integers"}), 400
+    if draws > MAX_MONTE_CARLO_DRAWS:
+        return jsonify({"error": f"At most {MAX_MONTE_CARLO_DRAWS} draws per run"}), 413
+
+    drivers = data.get("drivers") or {}
+    if not isinstance(drivers, dict):
+        return jsonify({"error": "'drivers' must be an object"}), 400
+
+    try:
+        baseline = get_baseline(data.get("base"))
+    except (AttributeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+    too_large = _over_budget(draws, baseline, MAX_MONTE_CARLO_CELLS, "draws per run")
+    if too_large:
+        return too_large
+
+    try:
+        result = run_monte_carlo(
+            drivers,
+            draws=draws,
+            seed=seed,
+            base=data.get("base"),
+            percentiles=data.get("percentiles", [5, 50, 95]),
+            **valuation_options(data),
+        )
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
+
+# -----------------------------
+# SENSITIVITY (TORNADO)
+# -----------------------------
+@app.route("/sensitivity", methods=["POST"])
+def sensitivity():
+    data = request.json or {}
+
+    try:
+        year = data.get("year")
+        year = None if year is None else int(year)
+        result = run_sensitivity(
+            base=data.get("base"),
+            params=data.get("params") or SCALE_KEYS,
+            steps=data.get("steps") or [0.1],
+            outputs=data.get("outputs") or DEFAULT_OUTPUTS,
+            year=year,
+        )
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
+
+# -----------------------------
+# GOAL SEEK
+# -----------------------------
+@app.route("/goal_seek", methods=["POST"])
+def goal_seek():
+    data = request.json or {}
+
+    variables = data.get("variables") or data.get("variable")
+    if isinstance(variables, str):
+        variables = [variables]
+
+    try:
+        year = data.get("year")
+        result = solve_goal(
+            target=float(data.get("target", 0.0)),
+            metric=data.get("metric", "profit"),
+            variables=variables or [],
+            base=data.get("base"),
+            year=None if year is None else int(year),
+            low=float(data.get("low", 0.0)),
+            high=float(data.get("high", 5.0)),
+        )
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
+
+# -----------------------------
+# PARAMETER SWEEP (streamed NDJSON)
+# -----------------------------
+@app.route("/sweep", methods=["POST"])
+def sweep():
+    data = request.json or {}
+
+    try:
+        fmt = parse_format(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    outputs = data.get("outputs") or SWEEP_OUTPUTS
+    try:
+        axes = sweep_axes(data.get("axes") or [])
+        year = data.get("year")
+        year = None if year is None else int(year)
+        chunk_size = max(1, int(data.get("chunk_size", 10_000)))
+        baseline = get_baseline(data.get("base"))
+    except (TypeError, ValueError, AttributeError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    unknown = set(outputs) - set(metric_names())
+    if unknown:
+        return jsonify({"error": f"Unknown outputs: {sorted(unknown)}"}), 400
+
+    points = 1
+    for axis in axes:
+        points *= len(axis["values"])
+    if points > MAX_SWEEP_POINTS:
+        return jsonify({"error": f"At most {MAX_SWEEP_POINTS} grid points per sweep"}), 413
+    too_large = _over_budget(points, baseline, MAX_SWEEP_CELLS, "grid points per sweep")
+    if too_large:
+        return too_large
+
+    messages = sweep_chunks(
+        data["axes"],
+        base=data.get("base"),
+        outputs=outputs,
+        year=year,
+        chunk_size=chunk_size,
+        fmt=fmt,
+    )
+    lines = (json.dumps(message) + "\n" for message in messages)
+    return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+# -----------------------------
+# LIVE SESSIONS (slider deltas in, changed series out over SSE)
+# -----------------------------
+@app.route("/live/sessions", methods=["POST"])
+def create_live_session():
+    params = request.json or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "Expected a JSON object of scenario params"}), 400
+    try:
+        session = live_sessions.create(params)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except RuntimeError as exc:
+        return jsonify({"error": str(exc)}), 503
+
+    return jsonify({"session_id": session.id, **session.snapshot()}), 201
+
+
+@app.route("/live/sessions/<session_id>/params", methods=["POST"])
+def live_session_params(session_id):
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+
+    delta = request.json
+    if not isinstance(delta, dict):
+        return jsonify({"error": "Expected a JSON object of changed params"}), 400
+    try:
+        seq = session.submit(delta)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({"seq": seq}), 202
+
+
+@app.route("/live/sessions/<session_id>/events", methods=["GET"])
+def live_session_events(session_id):
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+
+    def events():
+        # Full state first, so a reconnecting client starts from scratch
+        yield f"event: update\ndata: {json.dumps(session.snapshot())}\n\n"
+        while not session.closed:
+            update = session.next_update(timeout=LIVE_HEARTBEAT_SECONDS)
+            if update is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: update\ndata: {json.dumps(update)}\n\n"
+            session.last_seen = time.monotonic()
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/live/sessions/<session_id>", methods=["DELETE"])
+def close_live_session(session_id):
+    if not live_sessions.close(session_id):
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"status": "closed"})
+
 # -----------------------------
 # SAVE SCENARIO
 # -----------------------------
@@ -35,14 +649,18 @@ def run_model():
 def save_scenario():
     scenario = request.json
     name = scenario.get("name", "scenario")
+    tags = scenario.get("tags") or []
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        return jsonify({"error": "tags must be a list of strings"}), 400
 
-    os.makedirs("data/scenarios", exist_ok=True)
-    path = f"data/scenarios/{name}.json"
-
-    with open(path, "w") as f:
-        json.dump(scenario, f, indent=4)
-
-    return jsonify({"status": "ok", "path": path})
+    try:
+        materialized = materialize([scenario])[0]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    meta = get_scenario_store().save(name, scenario, tags=tags, materialized=materialized)
+    summary = dict(materialized.summary, worst_color=color_label(materialized.summary["worst_color"]))
+    # "path" predates the SQLite store: it now names the database file
+    return jsonify({"status": "ok", "path": SCENARIO_DB, **meta, "summary": summary})
 
 # -----------------------------
 # LOAD SCENARIO
@@ -50,28 +668,147 @@ def save_scenario():
 @app.route("/load_scenario", methods=["POST"])
 def load_scenario():
     name = request.json.get("name")
-    path = f"data/scenarios/{name}.json"
+    record = get_scenario_store().get(name)
 
-    if not os.path.exists(path):
+    if record is None:
         return jsonify({"error": "Scenario not found"}), 404
 
-    with open(path, "r") as f:
-        scenario = json.load(f)
+    return jsonify(record["data"])
 
-    return jsonify(scenario)
+@app.route("/load_scenarios", methods=["POST"])
+def load_scenarios():
+    names = (request.json or {}).get("names")
+    if not isinstance(names, list):
+        return jsonify({"error": "Expected {\"names\": [...]}"}), 400
+
+    records = get_scenario_store().get_many(names)
+    return jsonify({
+        "scenarios": {name: record["data"] for name, record in records.items()},
+        "missing": [name for name in names if name not in records],
+    })
+
+@app.route("/scenario_results", methods=["POST"])
+def scenario_results():
+    name = (request.json or {}).get("name")
+    results = get_scenario_store().get_results(name, stored_version())
+    if results is None:
+        record = get_scenario_store().get(name)
+        if record is None:
+            return jsonify({"error": "Scenario not found"}), 404
+        # Stored by an older engine or rule set: recompute and keep the fresh copy
+        try:
+            materialized = materialize([record["data"]])[0]
+        except ValueError as exc:
+            return jsonify({"error": f"Invalid stored scenario: {exc}"}), 422
+        get_scenario_store().save_results([(name, materialized)])
+        results = materialized.results
+
+    return jsonify(results)
+
+# -----------------------------
+# COMPARE SAVED SCENARIOS
+# -----------------------------
+@app.route("/compare_scenarios", methods=["POST"])
+def compare_scenarios():
+    data = request.json or {}
+    names = data.get("names")
+    if not isinstance(names, list) or not names:
+        return jsonify({"error": "Expected a non-empty \"names\" list"}), 400
+    names = list(dict.fromkeys(names))
+    if len(names) > MAX_COMPARE_SCENARIOS:
+        return jsonify({"error": f"At most {MAX_COMPARE_SCENARIOS} scenarios per comparison"}), 413
+
+    try:
+        fmt = parse_format(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    records = get_scenario_store().get_many(names)
+    missing = [name for name in names if name not in records]
+    if missing:
+        return jsonify({"error": "Scenario not found", "missing": missing}), 404
+
+    params = [records[name]["data"] for name in names]
+    try:
+        too_large = _over_budget(
+            len(names), shared_baseline(params), MAX_COMPARE_CELLS, "scenarios per comparison"
+        )
+        if too_large:
+            return too_large
+        result = run_comparison(
+            params,
+            names,
+            reference=data.get("reference", names[0]),
+            series=data.get("series") or COMPARE_SERIES,
+            fmt=fmt,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(result)
 
 # -----------------------------
 # LIST SCENARIOS
 # -----------------------------
 @app.route("/list_scenarios", methods=["GET"])
 def list_scenarios():
-    os.makedirs("data/scenarios", exist_ok=True)
-    files = os.listdir("data/scenarios")
-    names = [f.replace(".json", "") for f in files if f.endswith(".json")]
-    return jsonify(names)
+    # Original shape: every saved scenario name (see /scenarios for metadata)
+    return jsonify(get_scenario_store().names())
+
+
+@app.route("/scenarios", methods=["GET"])
+def list_scenario_metadata():
+    """
+    Paginated scenario metadata with materialized summaries. Query args:
+    limit, offset, tag, prefix, sort (name, created_at, updated_at or a
+    summary field), order (asc / desc), min_<field> / max_<field> and
+    worst_color (red / yellow / green).
+    """
+    args = request.args
+    ranges = {}
+    try:
+        limit = min(max(int(args.get("limit", 100)), 1), MAX_SCENARIO_PAGE)
+        offset = max(int(args.get("offset", 0)), 0)
+        for field in SUMMARY_FIELDS:
+            low, high = args.get(f"min_{field}"), args.get(f"max_{field}")
+            if low is not None or high is not None:
+                ranges[field] = (
+                    None if low is None else float(low),
+                    None if high is None else float(high),
+                )
+    except ValueError:
+        return jsonify({"error": "limit, offset and min_/max_ filters must be numbers"}), 400
+
+    color = args.get("worst_color")
+    if color is not None:
+        if color not in COLORS:
+            return jsonify({"error": f"worst_color must be one of {list(COLORS)}"}), 400
+        code = COLORS.index(color)
+        ranges["worst_color"] = (code, code)
+
+    _refresh_scenario_results()
+    try:
+        items, total = get_scenario_store().list(
+            limit=limit,
+            offset=offset,
+            tag=args.get("tag"),
+            prefix=args.get("prefix"),
+            engine_version=stored_version(),
+            sort=args.get("sort", "name"),
+            descending=args.get("order", "asc") == "desc",
+            ranges=ranges,
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    for item in items:
+        if item["summary"] is not None:
+            item["summary"]["worst_color"] = color_label(item["summary"]["worst_color"])
+    return jsonify({"scenarios": items, "total": total, "limit": limit, "offset": offset})
 
 # -----------------------------
 # MAIN
 # -----------------------------
 if __name__ == "__main__":
+    get_scenario_store()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,247 @@
+"""
+Benchmarks of the engine, reasonability scoring and the /run_model path.
+
+    python benchmark.py run [-o benchmarks/current.json] [--quick] [-k PATTERN]
+    python benchmark.py compare BASELINE.json CURRENT.json [--threshold 0.15]
+
+`run` times every benchmark and saves the results as a JSON baseline;
+`compare` prints the change of each median time and exits with status 1
+when one of them is slower than the baseline by more than the threshold
+(a fraction, 0.15 = 15 %). Baselines are only comparable on the same
+machine.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from financial_engine import (
+    ENGINE_VERSION,
+    SCALE_KEYS,
+    compute_financials,
+    compute_financials_batch,
+)
+from reasonability import evaluate_reasonability, evaluate_reasonability_batch
+
+DEFAULT_OUTPUT = "benchmarks/current.json"
+DEFAULT_THRESHOLD = 0.15
+
+BATCH_SIZES = (1, 1_000, 100_000)
+
+# (name, setup) where setup() returns (call, items per call, calls per sample)
+Benchmark = Tuple[str, Callable[[], Tuple[Callable[[], Any], int, int]]]
+
+
+def _scales(n: int) -> np.ndarray:
+    return np.random.default_rng(0).uniform(0.5, 1.5, (n, len(SCALE_KEYS)))
+
+
+def _engine_scalar():
+    params = {"mau_scale": 1.2, "marketing_scale": 0.9}
+    return lambda: compute_financials(params), 1, 100
+
+
+def _engine_scalar_lean():
+    params = {"mau_scale": 1.2, "marketing_scale": 0.9}
+    return lambda: compute_financials(params, debug_table=False), 1, 100
+
+
+def _main_scalar():
+    from main import compute_model
+
+    params = {"mau_scale": 1.2, "marketing_scale": 0.9}
+    return lambda: compute_model(params), 1, 100
+
+
+def _engine_batch(n: int):
+    def setup():
+        scales = _scales(n)
+        return lambda: compute_financials_batch(scales), n, max(1, 1_000 // n)
+
+    return setup
+
+
+def _reasonability_scalar():
+    results = compute_financials({"mau_scale": 1.2})
+    return lambda: evaluate_reasonability(results), 1, 100
+
+
+def _reasonability_batch(n: int):
+    def setup():
+        batch = compute_financials_batch(_scales(n))
+        return lambda: evaluate_reasonability_batch(batch), n, 1
+
+    return setup
+
+
+def _flask_client():
+    # Keep the scenario store out of the working tree
+    os.environ.setdefault("SCENARIO_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+    from app import app
+
+    return app.test_client()
+
+
+def _http_run_model_cached():
+    client = _flask_client()
+    params = {"mau_scale": 1.2}
+    client.post("/run_model", json=params)
+    return lambda: client.post("/run_model", json=params), 1, 20
+
+
+def _http_run_model_uncached():
+    client = _flask_client()
+    counter = iter(range(10**9))
+
+    def call():
+        # A fresh scale every call, so the result cache never hits
+        return client.post("/run_model", json={"mau_scale": 1.0 + next(counter) * 1e-9})
+
+    return call, 1, 20
+
+
+BENCHMARKS: List[Benchmark] = [
+    ("engine.scalar", _engine_scalar),
+    ("engine.scalar.no_debug_table", _engine_scalar_lean),
+    ("main.compute_model", _main_scalar),
+    *((f"engine.batch.{n}", _engine_batch(n)) for n in BATCH_SIZES),
+    ("reasonability.scalar", _reasonability_scalar),
+    ("reasonability.batch.100000", _reasonability_batch(100_000)),
+    ("http.run_model.cached", _http_run_model_cached),
+    ("http.run_model.uncached", _http_run_model_uncached),
+]
+
+
+def measure(call: Callable[[], Any], number: int, repeat: int) -> List[float]:
+    """Seconds per call over `repeat` samples of `number` calls (after a warm-up call)."""
+    call()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def run(pattern: Optional[str] = None, quick: bool = False) -> Dict[str, Any]:
+    repeat = 3 if quick else 15
+    results: Dict[str, Dict[str, float]] = {}
+    for name, setup in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+        call, items, number = setup()
+        samples = measure(call, max(1, number // 10) if quick else number, repeat)
+        median = statistics.median(samples)
+        results[name] = {
+            "median": median,
+            "min": min(samples),
+            "p95": float(np.percentile(samples, 95)),
+            "items_per_second": items / median,
+        }
+        print(f"{name:32s} {_format_time(median):>10s}  {items / median:>14,.0f} /s")
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "engine_version": ENGINE_VERSION,
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "commit": _git_commit(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Print the median-time change per benchmark; returns the regressed names."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:32s} {_format_time(result['median']):>10s}  (new)")
+            continue
+        change = result["median"] / before["median"] - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:32s} {_format_time(before['median']):>10s} -> "
+            f"{_format_time(result['median']):>10s}  {change:+7.1%}{flag}"
+        )
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the benchmarks and save a JSON baseline")
+    run_cmd.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    run_cmd.add_argument("-k", dest="pattern", help="only benchmarks whose name contains this")
+    run_cmd.add_argument("--quick", action="store_true", help="fewer samples, for smoke runs")
+
+    compare_cmd = commands.add_parser("compare", help="compare two saved baselines")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run(args.pattern, args.quick)
+        if os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        names = ", ".join(regressions)
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {names}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Retention curves, as the share of a cohort still active `age` months
+# after acquisition (1.0 at age 0):
+#   {"curve": "geometric", "rate": r}        r ** age
+#   {"curve": "power", "alpha": a}           (1 + age) ** -a
+#   {"curve": "table", "values": [...]}      monthly values, last one held
+CURVES = ("geometric", "power", "table")
+
+RetentionKey = Optional[Tuple[str, Tuple[float, ...]]]
+
+
+def retention_key(params: Dict[str, Any]) -> RetentionKey:
+    """Validated, hashable params["retention"]; None keeps the RECURRENCY rule."""
+    spec = params.get("retention")
+    if spec is None:
+        return None
+    if not isinstance(spec, dict) or spec.get("curve") not in CURVES:
+        raise ValueError(f"retention needs a curve among {CURVES}")
+
+    curve = spec["curve"]
+    try:
+        if curve == "geometric":
+            values = (float(spec["rate"]),)
+        elif curve == "power":
+            values = (float(spec["alpha"]),)
+        else:
+            values = tuple(float(v) for v in spec["values"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid parameters for the {curve!r} retention curve") from None
+
+    if curve == "geometric" and not 0.0 <= values[0] <= 1.0:
+        raise ValueError("geometric retention rate must be within [0, 1]")
+    if curve == "power" and not (np.isfinite(values[0]) and values[0] >= 0.0):
+        raise ValueError("power retention alpha must be a finite number >= 0")
+    if curve == "table" and (not values or any(not 0.0 <= v <= 1.0 for v in values)):
+        raise ValueError("retention table needs values within [0, 1]")
+    return curve, values
+
+
+def retention_curve(key: RetentionKey, periods: int, periods_per_year: int) -> np.ndarray:
+    """Retention at ages 0..periods-1 periods, sampled every 12 / periods_per_year months."""
+    curve, values = key
+    months = np.arange(periods) * (12.0 / periods_per_year)
+    if curve == "geometric":
+        r = values[0] ** months
+    elif curve == "power":
+        r = (1.0 + months) ** -values[0]
+    else:
+        table = np.asarray(values)
+        r = table[np.minimum(months.astype(int), len(table) - 1)]
+    r = r.astype(float)
+    r[0] = 1.0
+    return r
+
+
+def acquisitions(target_mau: np.ndarray, retention: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    New users per period needed for the MAU path `target_mau` under
+    `retention`, and the MAU the cohorts actually produce.
+
+    Each period acquires whatever the surviving earlier cohorts do not
+    cover, never a negative amount, so realized MAU is max(target,
+    survivors). Both outputs are positively homogeneous in target_mau,
+    which lets the engine scale them by mau_scale instead of redoing this.
+    """
+    periods = len(target_mau)
+    new = np.zeros(periods)
+    # Survivors of all cohorts acquired so far, per future period
+    carried = np.zeros(periods)
+    for t in range(periods):
+        new[t] = max(target_mau[t] - carried[t], 0.0)
+        carried[t:] += new[t] * retention[: periods - t]
+    return new, carried
+
+
+def cohort_matrix(new_users: np.ndarray, retention: np.ndarray) -> np.ndarray:
+    """
+    Active users as an (acquisition period, active period) matrix: cohort a
+    contributes new_users[a] × retention[t - a] for t >= a, 0 before.
+    Column sums are the realized MAU.
+    """
+    periods = len(new_users)
+    age = np.arange(periods)[None, :] - np.arange(periods)[:, None]
+    active = np.where(age >= 0, retention[np.clip(age, 0, None)], 0.0)
+    return new_users[:, None] * active
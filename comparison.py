@@ -0,0 +1,57 @@
+from typing import Dict, Any, List, Sequence
+
+from encoding import ResponseFormat, encode_array
+from financial_engine import BATCH_SERIES, compute_financials_batch, shared_baseline
+from metrics import METRICS, evaluate_metric, to_json_list
+
+DEFAULT_SERIES = ["revenues", "costs", "profit", "mau"]
+
+
+def compare_scenarios(
+    scenarios: Sequence[Dict[str, Any]],
+    names: Sequence[str],
+    reference: str,
+    series: Sequence[str] = DEFAULT_SERIES,
+    fmt: ResponseFormat = ResponseFormat(),
+) -> Dict[str, Any]:
+    """
+    Side-by-side comparison of K scenarios evaluated in one
+    compute_financials_batch call (they must share the same horizon).
+
+    series[field] is a (K, T) matrix aligned with `names`; differences[field]
+    is each row minus the reference row (the reference row is all zeros).
+    metrics holds the whole-horizon metrics per scenario and their
+    differences against the reference.
+    """
+    unknown = set(series) - set(BATCH_SERIES)
+    if unknown:
+        raise ValueError(f"Unknown series {sorted(unknown)}, available: {BATCH_SERIES}")
+    if reference not in names:
+        raise ValueError(f"Reference {reference!r} is not among the compared scenarios")
+
+    batch = compute_financials_batch(list(scenarios), shared_baseline(scenarios))
+    ref = list(names).index(reference)
+
+    values: Dict[str, Any] = {}
+    differences: Dict[str, Any] = {}
+    for field in series:
+        matrix = batch[field]
+        values[field] = encode_array(matrix, fmt)
+        differences[field] = encode_array(matrix - matrix[ref], fmt)
+
+    metrics: Dict[str, Dict[str, List[Any]]] = {}
+    for name in sorted(METRICS):
+        column = evaluate_metric(batch, name)
+        metrics[name] = {
+            "values": to_json_list(column),
+            "differences": to_json_list(column - column[ref]),
+        }
+
+    return {
+        "years": batch["years"].tolist(),
+        "names": list(names),
+        "reference": reference,
+        "series": values,
+        "differences": differences,
+        "metrics": metrics,
+    }
@@ -0,0 +1,118 @@
+import base64
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+
+from metrics import to_json_list
+
+LAYOUTS = ("rows", "columnar")
+ENCODINGS = ("json", "f32", "f64")
+
+# Row view and alias duplicated by the other series, dropped in columnar layout
+_COLUMNAR_DROP = ("debug_table", "cac_paying")
+
+_DTYPES = {"f32": "<f4", "f64": "<f8"}
+
+# Period labels, always kept and never encoded
+_LABELS = ("years", "months")
+
+
+class ResponseFormat(NamedTuple):
+    """
+    How model results are serialized:
+      - fields:    only these result keys (plus "years" / "months"); None keeps all
+      - columnar:  drop the row-oriented debug_table and the cac_paying alias
+      - precision: round floats to this many decimals (JSON encoding)
+      - encoding:  "json" lists, or "f32" / "f64" base64 little-endian blobs
+    """
+
+    fields: Optional[List[str]] = None
+    columnar: bool = False
+    precision: Optional[int] = None
+    encoding: str = "json"
+
+    @property
+    def is_default(self) -> bool:
+        return self == ResponseFormat()
+
+    @property
+    def has_debug_table(self) -> bool:
+        """Whether formatted results keep the debug_table (if present)."""
+        return not self.columnar and (self.fields is None or "debug_table" in self.fields)
+
+
+def parse_format(args: Mapping[str, str]) -> ResponseFormat:
+    """Read ResponseFormat from query arguments (fields, layout, precision, encoding)."""
+    fields = args.get("fields")
+    layout = args.get("layout", "rows")
+    precision = args.get("precision")
+    encoding = args.get("encoding", "json")
+
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {LAYOUTS}")
+    if encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be one of {ENCODINGS}")
+    if precision is not None:
+        try:
+            precision = int(precision)
+        except ValueError:
+            raise ValueError("precision must be an integer") from None
+
+    return ResponseFormat(
+        fields=[f for f in fields.split(",") if f] if fields else None,
+        columnar=layout == "columnar",
+        precision=precision,
+        encoding=encoding,
+    )
+
+
+def encode_array(values: Any, fmt: ResponseFormat) -> Any:
+    """One numeric series (list or array, any shape) in the requested encoding."""
+    arr = np.asarray(values, dtype=float)
+
+    if fmt.encoding in _DTYPES:
+        packed = arr.astype(_DTYPES[fmt.encoding])
+        return {
+            "dtype": fmt.encoding,
+            "shape": list(arr.shape),
+            "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+        }
+
+    if fmt.precision is not None:
+        arr = np.round(arr, fmt.precision)
+    return to_json_list(arr)
+
+
+def format_results(results: Dict[str, Any], fmt: ResponseFormat) -> Dict[str, Any]:
+    """
+    Apply field projection, layout and encoding to a results dict
+    (compute_financials payload or compute_financials_batch arrays).
+    """
+    if fmt.is_default:
+        return results
+
+    if fmt.fields is not None:
+        unknown = set(fmt.fields) - set(results)
+        if unknown:
+            raise ValueError(f"Unknown fields {sorted(unknown)}, available: {sorted(results)}")
+
+    out: Dict[str, Any] = {}
+    for key, value in results.items():
+        if key in _LABELS:
+            out[key] = np.asarray(value).tolist()
+            continue
+        if fmt.fields is not None and key not in fmt.fields:
+            continue
+        if fmt.columnar and key in _COLUMNAR_DROP:
+            continue
+        if key == "debug_table":
+            out[key] = value if fmt.precision is None else [
+                {k: round(v, fmt.precision) for k, v in row.items()} for row in value
+            ]
+            continue
+        if isinstance(value, dict):
+            # Nested series (e.g. the "monthly" block of monthly results)
+            out[key] = {name: encode_array(series, fmt) for name, series in value.items()}
+            continue
+        out[key] = encode_array(value, fmt)
+    return out
@@ -1,7 +1,34 @@
-from typing import Dict, Any, List
+import functools
+import os
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from cohorts import RetentionKey, acquisitions, retention_curve, retention_key
+from formula_graph import FormulaGraph, GraphState, Row
+from instrumentation import stage_timer
+from workbook import load_workbook_rows
 
 YEARS: List[int] = list(range(1, 15))
 
+# Bump whenever a change alters computed numbers (invalidates cached results)
+ENGINE_VERSION = "3"
+
+# Sliders exposed by the frontend, in the column order used by the batch engine
+SCALE_KEYS: List[str] = [
+    "mau_scale",
+    "conv_game_scale",
+    "conv_course_scale",
+    "marketing_scale",
+    "event_yield_scale",
+    "content_cost_scale",
+    "staff_scale",
+    "srv_hw_scale",
+]
+
+SPACE_MIN_PROFIT = 5_000_000.0  # space system only funded above this profit
+RECURRENCY = 0.4  # 40% monthly recurrency as in F126
+
 # === Baseline vectors taken from "Hyp Financials" sheet (rows indicated) ===
 
 BASE_MAU = [  # row 5 - Average MAU
@@ -386,7 +413,386 @@ def _get_scale(params: Dict[str, Any], key: str, default: float = 1.0) -> float:
     return max(val, 0.0)
 
 
-def compute_financials(params: Dict[str, Any]) -> Dict[str, Any]:
+def normalized_params(params: Dict[str, Any]) -> Tuple[float, ...]:
+    """
+    The scales compute_financials actually uses, in SCALE_KEYS order.
+
+    Two parameter dicts with equal normalized tuples and equal
+    baseline_key() produce identical results, so those (plus ENGINE_VERSION)
+    make a safe cache key.
+    """
+    return tuple(_get_scale(params, key, 1.0) for key in SCALE_KEYS)
+
+
+# === Horizon: baseline rows extended past the sheet years ===
+#
+# The sheet covers YEARS; longer horizons continue every baseline row with
+# its extrapolation rule, applied to the last sheet value k years later:
+#
+#   {"rule": "hold"}                  last value (the sheet itself repeats
+#                                     year 10 over years 11-14)
+#   {"rule": "growth", "rate": r}     last × (1 + r)^k
+#   {"rule": "decay", "rate": r}      last × (1 - r)^k, 0 <= r <= 1
+#
+# Shorter horizons truncate the sheet.
+
+MAX_HORIZON = 100
+
+BASE_ROWS: Dict[str, List[float]] = {
+    "mau": BASE_MAU,
+    "conv_game": BASE_CONV_GAME,
+    "conv_premium": BASE_CONV_PREMIUM,
+    "conv_small": BASE_CONV_SMALL,
+    "conv_cert": BASE_CONV_CERT,
+    "rev_game": BASE_REV_GAME,
+    "rev_formation": BASE_REV_FORMATION,
+    "rev_xr": BASE_REV_XR,
+    "salaries": BASE_SALARIES,
+    "staff_count": BASE_STAFF_COUNT,
+    "cost_hw": BASE_COST_HW,
+    "cost_web3": BASE_COST_WEB3,
+    "cost_game_dev": BASE_COST_GAME_DEV,
+    "cost_formation": BASE_COST_FORMATION,
+    "cost_space_system": BASE_COST_SPACE_SYSTEM,
+    "cost_space_ops": BASE_COST_SPACE_OPS,
+    "cost_prices": BASE_COST_PRICES,
+    "marketing_events": BASE_MARKETING_COMPONENTS["events"],
+    "marketing_sponsors": BASE_MARKETING_COMPONENTS["sponsors"],
+    "marketing_travels": BASE_MARKETING_COMPONENTS["travels"],
+    "marketing_publicity": BASE_MARKETING_COMPONENTS["publicity"],
+}
+
+# === Baseline source: the rows above or the model workbook ===
+#
+# With BASELINE_WORKBOOK set, the rows come from the "Hyp Financials" sheet
+# of that .xlsx instead (see workbook.py); load_baseline_workbook() reloads
+# it. The active source is part of baseline_key(), so baselines, cached
+# results and ETags of different sources never mix.
+
+BASELINE_WORKBOOK = os.environ.get("BASELINE_WORKBOOK")
+BUILTIN_SOURCE = "builtin"
+
+# Source id -> rows; earlier sources stay for keys computed before a reload
+_sources: Dict[str, Dict[str, Any]] = {BUILTIN_SOURCE: BASE_ROWS}
+_source = BUILTIN_SOURCE
+
+
+def load_baseline_workbook(path: Optional[str] = None) -> str:
+    """(Re)load the baseline rows from a workbook and make them the active source."""
+    global _source
+    path = path or BASELINE_WORKBOOK
+    if not path:
+        raise ValueError("No baseline workbook configured (BASELINE_WORKBOOK)")
+    digest, rows = load_workbook_rows(path)
+    source = digest[:16]
+    _sources[source] = rows
+    _source = source
+    return source
+
+
+def baseline_source() -> str:
+    """Id of the active baseline rows: BUILTIN_SOURCE or the workbook hash prefix."""
+    return _source
+
+
+def results_version() -> str:
+    """Version of stored results: ENGINE_VERSION, plus the source of workbook baselines."""
+    return ENGINE_VERSION if _source == BUILTIN_SOURCE else f"{ENGINE_VERSION}+{_source}"
+
+
+if BASELINE_WORKBOOK:
+    load_baseline_workbook()
+
+EXTRAPOLATION: Dict[str, Dict[str, Any]] = {
+    "mau": {"rule": "hold"},
+    "conv_game": {"rule": "hold"},
+    "conv_premium": {"rule": "hold"},
+    "conv_small": {"rule": "hold"},
+    "conv_cert": {"rule": "hold"},
+    "rev_game": {"rule": "hold"},
+    "rev_formation": {"rule": "hold"},
+    "rev_xr": {"rule": "hold"},
+    "salaries": {"rule": "hold"},
+    "staff_count": {"rule": "hold"},
+    "cost_hw": {"rule": "hold"},
+    "cost_web3": {"rule": "hold"},
+    "cost_game_dev": {"rule": "hold"},
+    "cost_formation": {"rule": "hold"},
+    "cost_space_system": {"rule": "hold"},
+    "cost_space_ops": {"rule": "hold"},
+    "cost_prices": {"rule": "hold"},
+    "marketing_events": {"rule": "hold"},
+    "marketing_sponsors": {"rule": "hold"},
+    "marketing_travels": {"rule": "hold"},
+    "marketing_publicity": {"rule": "hold"},
+}
+
+EXTRAPOLATION_RULES = ("hold", "growth", "decay")
+
+# Validated overrides as sorted (row, rule, rate) triples (hashable)
+Rules = Tuple[Tuple[str, str, float], ...]
+
+# (horizon, rules, retention, baseline source), see baseline_key()
+BaselineKey = Tuple[int, Rules, RetentionKey, str]
+
+
+def _rule_key(name: str, spec: Any) -> Tuple[str, str, float]:
+    if name not in BASE_ROWS:
+        raise ValueError(f"Unknown baseline row {name!r}, expected one of {sorted(BASE_ROWS)}")
+    if not isinstance(spec, dict) or spec.get("rule") not in EXTRAPOLATION_RULES:
+        raise ValueError(f"Extrapolation of {name!r} needs a rule among {EXTRAPOLATION_RULES}")
+    rule = spec["rule"]
+    try:
+        rate = 0.0 if rule == "hold" else float(spec["rate"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Extrapolation of {name!r} needs a numeric 'rate'") from None
+    if rule == "decay" and not 0.0 <= rate <= 1.0:
+        raise ValueError(f"Decay rate of {name!r} must be within [0, 1]")
+    # NaN or rates <= -1 would give NaN / sign-alternating rows
+    if rule == "growth" and not (np.isfinite(rate) and rate > -1.0):
+        raise ValueError(f"Growth rate of {name!r} must be a finite number > -1")
+    return name, rule, rate
+
+
+# Scenario keys read by baseline_key(), next to the SCALE_KEYS sliders
+BASELINE_PARAMS = ("horizon", "extrapolation", "retention")
+
+
+def baseline_key(params: Dict[str, Any]) -> BaselineKey:
+    """
+    (horizon, extrapolation overrides, retention curve, baseline source)
+    requested by params["horizon"], params["extrapolation"] ({row: rule
+    spec}) and params["retention"] (see cohorts.py) over the active
+    baseline rows; validated and hashable.
+    """
+    horizon = params.get("horizon")
+    if horizon is None:
+        horizon = len(YEARS)
+    if isinstance(horizon, bool) or not isinstance(horizon, (int, float)) or horizon % 1:
+        raise ValueError("horizon must be an integer number of years")
+    horizon = int(horizon)
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be within 1..{MAX_HORIZON}")
+
+    overrides = params.get("extrapolation") or {}
+    if not isinstance(overrides, dict):
+        raise ValueError("extrapolation must map baseline rows to rules")
+    rules = tuple(sorted(_rule_key(name, spec) for name, spec in overrides.items()))
+    return horizon, rules, retention_key(params), _source
+
+
+def _extend(values: List[float], horizon: int, rule: str, rate: float) -> np.ndarray:
+    base = np.asarray(values, dtype=float)
+    if horizon <= len(base):
+        return base[:horizon].copy()
+    k = np.arange(1, horizon - len(base) + 1, dtype=float)
+    if rule == "growth":
+        tail = base[-1] * (1.0 + rate) ** k
+    elif rule == "decay":
+        tail = base[-1] * (1.0 - rate) ** k
+    else:
+        tail = np.full(len(k), base[-1])
+    return np.concatenate((base, tail))
+
+
+# === Closed-form coefficient tables (built once per horizon) ===
+#
+# Every linear row of the model is a baseline vector times one product of
+# scales, so each year reduces to a few dot products between the scenario
+# drivers below and these coefficient columns:
+#
+#   revenues      = [mau·conv_game, mau·conv_course, event_yield] · [game, formation, xr]
+#   partial costs = [marketing, staff, staff·srv_hw, content, 1] · [mkt, salaries, hw, formation, fixed]
+#
+# Only the space-system clamp, the paying-ratio clamp and the CAC / ROAS
+# divisions are evaluated afterwards.
+
+
+def baseline_rows(
+    horizon: int, rules: Rules = (), source: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Baseline rows of `source` (the active one by default) extended (or
+    truncated) to `horizon` years with their extrapolation rules.
+    """
+    specs = {name: _rule_key(name, spec)[1:] for name, spec in EXTRAPOLATION.items()}
+    specs.update({name: (rule, rate) for name, rule, rate in rules})
+    rows = _sources[source or _source]
+    return {name: _extend(values, horizon, *specs[name]) for name, values in rows.items()}
+
+
+# Baseline attributes of the per-year rows unpacked by compute_financials
+# (after the year), also exported by /model_spec
+YEAR_COEFFS = (
+    "mau",
+    "coeff_game_rev",
+    "coeff_formation_rev",
+    "rev_xr",
+    "coeff_marketing",
+    "salaries",
+    "cost_hw",
+    "cost_formation",
+    "staff_count",
+    "cost_web3",
+    "cost_game_dev",
+    "cost_prices",
+    "coeff_fixed_costs",
+    "planned_space",
+    "coeff_new_users",
+    "conv_game",
+    "conv_premium",
+    "coeff_conv_course",
+)
+
+
+class Baseline:
+    """
+    Coefficient tables of the engine built from baseline rows (see
+    baseline_rows) with one value per period: years by default, or
+    periods_per_year sub-periods per year (the space system threshold is
+    pro-rated). Instances are cached by get_baseline() and compared by
+    identity (they are MODEL_GRAPH inputs).
+
+    With a retention curve, new users come from a cohort model instead of
+    the RECURRENCY rule: cohorts are acquired to meet the baseline MAU
+    (see cohorts.acquisitions) and the MAU they realize, which exceeds the
+    baseline where it falls faster than retention allows, drives MAU and
+    the per-user revenue rows.
+    """
+
+    def __init__(
+        self,
+        row: Dict[str, np.ndarray],
+        periods_per_year: int = 1,
+        retention: RetentionKey = None,
+    ):
+        self.periods_per_year = periods_per_year
+        self.periods = len(row["mau"])
+        self.horizon = self.periods // periods_per_year  # years
+        self.period_labels = np.arange(1, self.periods + 1)
+        self.year_list: List[int] = list(range(1, self.horizon + 1))
+        self.space_min_profit = SPACE_MIN_PROFIT / periods_per_year
+
+        self.mau = row["mau"]
+        self.retention = None
+        if retention is not None:
+            self.retention = retention_curve(retention, self.periods, periods_per_year)
+            self.cohort_new_users, self.mau = acquisitions(row["mau"], self.retention)
+        self.conv_game = row["conv_game"]
+        self.conv_premium = row["conv_premium"]
+        self.rev_xr = row["rev_xr"]
+        self.salaries = row["salaries"]
+        self.staff_count = row["staff_count"]
+        self.cost_hw = row["cost_hw"]
+        self.cost_web3 = row["cost_web3"]
+        self.cost_game_dev = row["cost_game_dev"]
+        self.cost_formation = row["cost_formation"]
+        self.cost_prices = row["cost_prices"]
+        self.planned_space = row["cost_space_system"] + row["cost_space_ops"]
+
+        # mau × (baseline revenue / baseline MAU) collapses to the baseline
+        # revenue itself; years without baseline users earn nothing, as in
+        # the sheet (tests/test_engine_reference.py)
+        has_mau = row["mau"] > 0
+        self.coeff_game_rev = np.where(has_mau, row["rev_game"], 0.0)  # per mau·conv_game
+        self.coeff_formation_rev = np.where(has_mau, row["rev_formation"], 0.0)  # per mau·conv_course
+        if self.retention is not None:
+            # Revenue per user stays at its baseline value
+            lift = np.divide(self.mau, row["mau"], out=np.zeros(self.periods), where=has_mau)
+            self.coeff_game_rev = self.coeff_game_rev * lift
+            self.coeff_formation_rev = self.coeff_formation_rev * lift
+        self.coeff_marketing = (
+            row["marketing_events"]
+            + row["marketing_sponsors"]
+            + row["marketing_travels"]
+            + row["marketing_publicity"]
+        )
+        self.coeff_fixed_costs = self.cost_web3 + self.cost_game_dev + self.cost_prices
+
+        # New users per unit of mau_scale (row 126 adaptation, scales are >= 0)
+        if self.retention is None:
+            prev_mau = np.concatenate(([0.0], self.mau[:-1]))
+            self.coeff_new_users = np.maximum(self.mau - prev_mau * RECURRENCY, 0.0)
+        else:
+            self.coeff_new_users = self.cohort_new_users
+
+        self.coeff_conv_course = row["conv_small"] + row["conv_cert"]  # per conv_course
+
+        # Per-year rows for the scalar path, in the order unpacked by compute_financials
+        self.year_coeffs = list(
+            zip(self.year_list, *(getattr(self, name).tolist() for name in YEAR_COEFFS))
+        )
+
+
+@functools.lru_cache(maxsize=64)
+def _baseline(horizon: int, rules: Rules, retention: RetentionKey, source: str) -> Baseline:
+    return Baseline(baseline_rows(horizon, rules, source), retention=retention)
+
+
+def get_baseline(params: Optional[Dict[str, Any]] = None) -> Baseline:
+    """Cached Baseline for the horizon / extrapolation / retention requested by params."""
+    return _baseline(*baseline_key(params or {}))
+
+
+def source_rows(source: str) -> Dict[str, Any]:
+    """Unextended rows of a baseline source (the last item of a baseline_key())."""
+    return _sources[source]
+
+
+def baseline_for_key(key: BaselineKey, rows: Optional[Dict[str, Any]] = None) -> Baseline:
+    """
+    Cached Baseline of a baseline_key() result. Pool workers get the key
+    resolved by the parent, so a reload in between cannot change which
+    rows a job runs on, along with the source's rows: a worker started
+    before that source was loaded does not have them.
+    """
+    if rows is not None:
+        _sources.setdefault(key[-1], rows)
+    return _baseline(*key)
+
+
+def shared_baseline(params: Sequence[Dict[str, Any]]) -> Baseline:
+    """Baseline of a list of scenarios, which must all request the same horizon."""
+    keys = {baseline_key(p or {}) for p in params}
+    if len(keys) > 1:
+        raise ValueError(
+            "Scenarios evaluated together must share horizon, extrapolation and retention"
+        )
+    return _baseline(*keys.pop()) if keys else get_baseline()
+
+
+# Column order of the per-year rows built by compute_financials
+_DEBUG_KEYS = [
+    "year",
+    "mau",
+    "game_revenue",
+    "formation_revenue",
+    "xr_revenue",
+    "total_revenue",
+    "marketing_total",
+    "salaries",
+    "services_hw",
+    "web3_cost",
+    "game_dev_cost",
+    "formation_cost",
+    "prices_cost",
+    "space_cost_used",
+    "total_cost",
+    "profit_before_space",
+    "profit",
+    "new_users",
+    "new_paying_users",
+    "cac_total",
+    "cac_paying",
+    "roas",
+    "staff",
+]
+
+# debug_table columns named differently in compute_financials_batch results
+_BATCH_DEBUG_KEYS = {"total_revenue": "revenues", "total_cost": "costs"}
+
+
+def compute_financials(params: Dict[str, Any], debug_table: bool = True) -> Dict[str, Any]:
     """
     Core financial engine.
 
@@ -399,239 +805,407 @@ def compute_financials(params: Dict[str, Any]) -> Dict[str, Any]:
       - content_cost_scale
       - staff_scale
       - srv_hw_scale
+
+    and optionally "horizon" (years, default len(YEARS)) and "extrapolation"
+    overrides for the baseline rows (see EXTRAPOLATION).
+
+    Evaluated through the closed-form coefficient tables; rows of
+    compute_financials_batch match this function bit-for-bit. The per-year
+    "debug_table" dicts cost about as much as the model itself, so callers
+    that do not return them pass debug_table=False. With
+    STAGE_TIMERS on, stage times are recorded (stages 1-5 share one loop
+    over the years and are timed together as "rows").
     """
 
-    mau_scale = _get_scale(params, "mau_scale", 1.0)
-    conv_game_scale = _get_scale(params, "conv_game_scale", 1.0)
-    conv_course_scale = _get_scale(params, "conv_course_scale", 1.0)
-    marketing_scale = _get_scale(params, "marketing_scale", 1.0)
-    event_yield_scale = _get_scale(params, "event_yield_scale", 1.0)
-    content_cost_scale = _get_scale(params, "content_cost_scale", 1.0)
-    staff_scale = _get_scale(params, "staff_scale", 1.0)
-    srv_hw_scale = _get_scale(params, "srv_hw_scale", 1.0)
-
-    # === 1) Scale core drivers ===
-
-    mau = [base * mau_scale for base in BASE_MAU]
-
-    # Game conversion & course conversion — we just scale ratios
-    conv_game = [c * conv_game_scale for c in BASE_CONV_GAME]
-    conv_premium = BASE_CONV_PREMIUM  # kept as-is, used in CAC paying
-    conv_small = [c * conv_course_scale for c in BASE_CONV_SMALL]
-    conv_cert = [c * conv_course_scale for c in BASE_CONV_CERT]
-
-    # Marketing components
-    mkt_events = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["events"]]
-    mkt_sponsors = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["sponsors"]]
-    mkt_travels = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["travels"]]
-    mkt_publicity = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["publicity"]]
-
-    marketing_total = [
-        mkt_events[i]
-        + mkt_sponsors[i]
-        + mkt_travels[i]
-        + mkt_publicity[i]
-        for i in range(len(YEARS))
-    ]
-
-    # Event yields (XR + D revenues)
-    rev_xr = [BASE_REV_XR[i] * event_yield_scale for i in range(len(YEARS))]
-
-    # Formation/content costs
-    cost_formation = [BASE_COST_FORMATION[i] * content_cost_scale for i in range(len(YEARS))]
-
-    # Salaries & staff
-    staff = [BASE_STAFF_COUNT[i] * staff_scale for i in range(len(YEARS))]
-    cost_salaries = [BASE_SALARIES[i] * staff_scale for i in range(len(YEARS))]
-
-    # Services & HW: derived from base HW cost, scaled by both staff & srv_hw scale
-    cost_hw = [
-        BASE_COST_HW[i] * staff_scale * srv_hw_scale for i in range(len(YEARS))
-    ]
-
-    # Web3 costs, game dev (kept fixed except content scaling could be added later)
-    cost_web3 = BASE_COST_WEB3[:]
-    cost_game_dev = BASE_COST_GAME_DEV[:]
-
-    # === 2) Revenues, calibrated to keep Excel numbers at 1x ===
-
-    game_rev: List[float] = []
-    formation_rev: List[float] = []
-
-    for i in range(len(YEARS)):
-        base_m = BASE_MAU[i]
-        base_g = BASE_REV_GAME[i]
-        base_f = BASE_REV_FORMATION[i]
-
-        if base_m > 0:
-            # Effective revenue per MAU at baseline
-            rev_per_m_game = base_g / base_m
-            rev_per_m_form = base_f / base_m
-
-            # Scale with both MAU and the respective conversion sliders
-            game_rev.append(mau[i] * rev_per_m_game * conv_game_scale)
-            formation_rev.append(mau[i] * rev_per_m_form * conv_course_scale)
+    timer = stage_timer("compute_financials")
+    (
+        mau_scale,
+        conv_game_scale,
+        conv_course_scale,
+        marketing_scale,
+        event_yield_scale,
+        content_cost_scale,
+        staff_scale,
+        srv_hw_scale,
+    ) = normalized_params(params)
+    baseline = get_baseline(params)
+    if timer is not None:
+        timer.mark("inputs")
+
+    # === 1) Scale core drivers (one product per linear row) ===
+
+    game_driver = mau_scale * conv_game_scale
+    formation_driver = mau_scale * conv_course_scale
+    hw_driver = staff_scale * srv_hw_scale
+
+    rows = []
+    for (
+        year,
+        base_mau,
+        c_game,
+        c_formation,
+        c_xr,
+        c_marketing,
+        c_salaries,
+        c_hw,
+        c_formation_cost,
+        c_staff,
+        web3_cost,
+        game_dev_cost,
+        prices_cost,
+        c_fixed,
+        planned_space,
+        c_new_users,
+        c_conv_game,
+        conv_premium,
+        c_conv_course,
+    ) in baseline.year_coeffs:
+        mau = base_mau * mau_scale
+        marketing_total = c_marketing * marketing_scale
+        salaries = c_salaries * staff_scale
+        services_hw = c_hw * hw_driver
+        formation_cost = c_formation_cost * content_cost_scale
+
+        # === 2) Revenues ===
+
+        game_rev = c_game * game_driver
+        formation_rev = c_formation * formation_driver
+        xr_rev = c_xr * event_yield_scale
+        revenues = game_rev + formation_rev + xr_rev
+
+        # === 3) Space system costs driven by profitability (≥ 5M rule) ===
+
+        partial_costs = marketing_total + salaries + services_hw + formation_cost + c_fixed
+        profit_before = revenues - partial_costs
+        if profit_before <= SPACE_MIN_PROFIT:
+            space_used = 0.0
         else:
-            game_rev.append(0.0)
-            formation_rev.append(0.0)
-
-    revenues = [
-        game_rev[i] + formation_rev[i] + rev_xr[i]
-        for i in range(len(YEARS))
-    ]
-
-    # === 3) Space system costs driven by profitability (≥ 5M rule) ===
-
-    SPACE_MIN_PROFIT = 5_000_000.0
-    space_cost_used: List[float] = []
-    profit_before_space: List[float] = []
-    total_costs: List[float] = []
-    profit: List[float] = []
-
-    for i in range(len(YEARS)):
-        # Costs that do NOT depend on the profit rule
-        cost_marketing_i = marketing_total[i]
-        cost_salaries_i = cost_salaries[i]
-        cost_hw_i = cost_hw[i]
-        cost_web3_i = cost_web3[i]
-        cost_game_dev_i = cost_game_dev[i]
-        cost_formation_i = cost_formation[i]
-        cost_prices_i = BASE_COST_PRICES[i]
-
-        # Sum partial costs (without space system & ops)
-        partial_costs = (
-            cost_marketing_i
-            + cost_salaries_i
-            + cost_hw_i
-            + cost_web3_i
-            + cost_game_dev_i
-            + cost_formation_i
-            + cost_prices_i
+            space_used = min(planned_space, profit_before - SPACE_MIN_PROFIT)
+        total_cost = partial_costs + space_used
+        profit = revenues - total_cost
+
+        # === 4) CAC metrics (total & paying) ===
+
+        new_users = c_new_users * mau_scale
+        paying_ratio = c_conv_game * conv_game_scale + conv_premium + c_conv_course * conv_course_scale
+        paying_ratio = min(max(paying_ratio, 0.0), 1.0)
+        new_paying = new_users * paying_ratio
+        cac_total = marketing_total / new_users if new_users > 0 else 0.0
+        cac_paying = marketing_total / new_paying if new_paying > 0 else 0.0
+
+        # === 5) ROAS ===
+
+        roas = revenues / marketing_total if marketing_total > 0 else 0.0
+
+        rows.append(
+            (
+                year,
+                mau,
+                game_rev,
+                formation_rev,
+                xr_rev,
+                revenues,
+                marketing_total,
+                salaries,
+                services_hw,
+                web3_cost,
+                game_dev_cost,
+                formation_cost,
+                prices_cost,
+                space_used,
+                total_cost,
+                profit_before,
+                profit,
+                new_users,
+                new_paying,
+                cac_total,
+                cac_paying,
+                roas,
+                c_staff * staff_scale,
+            )
         )
 
-        profit_before = revenues[i] - partial_costs
+    if timer is not None:
+        timer.mark("rows")
 
-        # Planned space system + ops cost from Excel
-        planned_space = BASE_COST_SPACE_SYSTEM[i] + BASE_COST_SPACE_OPS[i]
+    # === 6) Build debug table (one row per year) ===
 
-        if profit_before <= SPACE_MIN_PROFIT:
-            # Not enough margin to sustain space system: invest 0 that year
-            space_used = 0.0
-        else:
-            # Invest up to what keeps profit >= 5M
-            max_affordable = profit_before - SPACE_MIN_PROFIT
-            space_used = min(planned_space, max_affordable)
+    col = dict(zip(_DEBUG_KEYS, map(list, zip(*rows))))
+    if debug_table:
+        table = [dict(zip(_DEBUG_KEYS, row)) for row in rows]
+    if timer is not None:
+        timer.mark("debug_table")
 
-        total_cost_i = partial_costs + space_used
-        profit_i = revenues[i] - total_cost_i
+    # === 7) Final results payload ===
 
-        profit_before_space.append(profit_before)
-        space_cost_used.append(space_used)
-        total_costs.append(total_cost_i)
-        profit.append(profit_i)
+    payload = {
+        "years": baseline.year_list,
+        "mau": col["mau"],
+        "revenues": col["total_revenue"],
+        "costs": col["total_cost"],
+        "profit": col["profit"],
+        "staff": col["staff"],
+        "roas": col["roas"],
+        "cac": col["cac_paying"],       # CAC per paying customer
+        "cac_total": col["cac_total"],  # CAC per new user
+        "cac_paying": col["cac_paying"],  # explicit alias
+        "game_revenue": col["game_revenue"],
+        "formation_revenue": col["formation_revenue"],
+        "xr_revenue": col["xr_revenue"],
+        "marketing_total": col["marketing_total"],
+        "space_cost_used": col["space_cost_used"],
+        "profit_before_space": col["profit_before_space"],
+    }
+    if debug_table:
+        payload["debug_table"] = table
+    if timer is not None:
+        timer.mark("payload")
+    return payload
 
-    # === 4) CAC metrics (total & paying) ===
 
-    RECURRENCY = 0.4  # 40% monthly recurrency as in F126
+# === Batch engine: N parameter sets evaluated as N × horizon arrays ===
 
-    new_users_raw: List[float] = []
-    new_paying_users: List[float] = []
-    cac_total: List[float] = []
-    cac_paying: List[float] = []
+def scales_matrix(params: Union[Sequence[Dict[str, Any]], np.ndarray]) -> np.ndarray:
+    """
+    Normalize N parameter sets into an (N, len(SCALE_KEYS)) float array.
 
-    for i in range(len(YEARS)):
-        if i == 0:
-            prev_mau = 0.0
-        else:
-            prev_mau = mau[i - 1]
+    Accepts either a sequence of slider dicts (missing or invalid values fall
+    back to 1.0, as in compute_financials) or an array already laid out in
+    SCALE_KEYS column order. Negative scales are clamped to 0.
+    """
+    if isinstance(params, np.ndarray):
+        scales = np.array(params, dtype=float, ndmin=2)
+        if scales.ndim != 2 or scales.shape[1] != len(SCALE_KEYS):
+            raise ValueError(
+                f"scales array must have shape (N, {len(SCALE_KEYS)}), got {scales.shape}"
+            )
+        return np.maximum(scales, 0.0)
+
+    rows = [[_get_scale(p or {}, key, 1.0) for key in SCALE_KEYS] for p in params]
+    return np.array(rows, dtype=float).reshape(len(rows), len(SCALE_KEYS))
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    # num / den where den > 0, 0.0 elsewhere (same convention as the scalar engine)
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den > 0)
+
+
+# The array engine as a graph of named rows. Inputs are the SCALE_KEYS as
+# (N, 1) columns plus the Baseline of the requested horizon; every row is
+# an (N, horizon) array except the fixed cost rows, which depend on the
+# baseline only and stay (horizon,). Formulas keep the operation order of
+# compute_financials, so graph rows match the scalar payload bit-for-bit.
+
+MODEL_GRAPH = FormulaGraph(
+    SCALE_KEYS + ["baseline"],
+    [
+        # === 1) Scale core drivers ===
+        Row("game_driver", ("mau_scale", "conv_game_scale"), lambda m, g: m * g),
+        Row("formation_driver", ("mau_scale", "conv_course_scale"), lambda m, c: m * c),
+        Row("hw_driver", ("staff_scale", "srv_hw_scale"), lambda s, h: s * h),
+        Row("mau", ("baseline", "mau_scale"), lambda b, m: b.mau * m, "5"),
+        Row(
+            "marketing_total",
+            ("baseline", "marketing_scale"),
+            lambda b, k: b.coeff_marketing * k,
+            "119",
+        ),
+        Row("salaries", ("baseline", "staff_scale"), lambda b, s: b.salaries * s, "66"),
+        Row("services_hw", ("baseline", "hw_driver"), lambda b, d: b.cost_hw * d, "81"),
+        Row(
+            "formation_cost",
+            ("baseline", "content_cost_scale"),
+            lambda b, c: b.cost_formation * c,
+            "104",
+        ),
+        Row("staff", ("baseline", "staff_scale"), lambda b, s: b.staff_count * s, "79"),
+        Row("web3_cost", ("baseline",), lambda b: b.cost_web3, "97"),
+        Row("game_dev_cost", ("baseline",), lambda b: b.cost_game_dev, "102"),
+        Row("prices_cost", ("baseline",), lambda b: b.cost_prices, "113"),
+        # === 2) Revenues ===
+        Row("game_revenue", ("baseline", "game_driver"), lambda b, d: b.coeff_game_rev * d, "11"),
+        Row(
+            "formation_revenue",
+            ("baseline", "formation_driver"),
+            lambda b, d: b.coeff_formation_rev * d,
+            "32",
+        ),
+        Row("xr_revenue", ("baseline", "event_yield_scale"), lambda b, e: b.rev_xr * e, "40"),
+        Row(
+            "revenues",
+            ("game_revenue", "formation_revenue", "xr_revenue"),
+            lambda g, f, x: g + f + x,
+            "55",
+        ),
+        # === 3) Space system costs driven by profitability (≥ 5M rule) ===
+        Row(
+            "partial_costs",
+            ("baseline", "marketing_total", "salaries", "services_hw", "formation_cost"),
+            lambda b, mk, sal, hw, fc: mk + sal + hw + fc + b.coeff_fixed_costs,
+        ),
+        Row("profit_before_space", ("revenues", "partial_costs"), lambda r, c: r - c),
+        Row(
+            "space_cost_used",
+            ("baseline", "profit_before_space"),
+            lambda b, pb: np.where(
+                pb <= b.space_min_profit,
+                0.0,
+                np.minimum(b.planned_space, pb - b.space_min_profit),
+            ),
+            "110-111",
+        ),
+        Row("costs", ("partial_costs", "space_cost_used"), lambda c, s: c + s, "129"),
+        Row("profit", ("revenues", "costs"), lambda r, c: r - c, "131"),
+        # === 4) CAC metrics (total & paying) ===
+        Row("new_users", ("baseline", "mau_scale"), lambda b, m: b.coeff_new_users * m, "126"),
+        Row(
+            "paying_ratio",
+            ("baseline", "conv_game_scale", "conv_course_scale"),
+            lambda b, g, c: np.minimum(
+                np.maximum(b.conv_game * g + b.conv_premium + b.coeff_conv_course * c, 0.0),
+                1.0,
+            ),
+        ),
+        Row("new_paying_users", ("new_users", "paying_ratio"), lambda u, r: u * r),
+        Row("cac_total", ("marketing_total", "new_users"), lambda mk, u: _safe_divide(mk, u)),
+        Row(
+            "cac_paying",
+            ("marketing_total", "new_paying_users"),
+            lambda mk, u: _safe_divide(mk, u),
+            "127",
+        ),
+        # === 5) ROAS ===
+        Row("roas", ("revenues", "marketing_total"), lambda r, mk: _safe_divide(r, mk)),
+    ],
+)
+
+# Rows returned by compute_financials_batch ("cac" is added as an alias)
+BATCH_SERIES: List[str] = [
+    "mau",
+    "revenues",
+    "costs",
+    "profit",
+    "staff",
+    "roas",
+    "cac_total",
+    "cac_paying",
+    "game_revenue",
+    "formation_revenue",
+    "xr_revenue",
+    "marketing_total",
+    "space_cost_used",
+    "profit_before_space",
+    "salaries",
+    "services_hw",
+    "web3_cost",
+    "game_dev_cost",
+    "formation_cost",
+    "prices_cost",
+    "new_users",
+    "new_paying_users",
+]
 
-        # New users after accounting for recurrency (simplified adaptation of row 126)
-        new_users = max(mau[i] - prev_mau * RECURRENCY, 0.0)
-        new_users_raw.append(new_users)
 
-        # Rough paying ratio = sum of the 4 conversion types
-        paying_ratio = conv_game[i] + conv_premium[i] + conv_small[i] + conv_cert[i]
-        paying_ratio = min(max(paying_ratio, 0.0), 1.0)
+def graph_inputs(scales: np.ndarray, baseline: Optional[Baseline] = None) -> Dict[str, Any]:
+    """MODEL_GRAPH inputs (one (N, 1) column per scale) for a scales matrix."""
+    inputs: Dict[str, Any] = {key: scales[:, j:j + 1] for j, key in enumerate(SCALE_KEYS)}
+    inputs["baseline"] = baseline or get_baseline()
+    return inputs
 
-        new_paying = new_users * paying_ratio
-        new_paying_users.append(new_paying)
 
-        # Acquisition spend: we tie CAC to marketing budget
-        acq_spend = marketing_total[i]
+def scale_inputs(params: Dict[str, Any]) -> Dict[str, Any]:
+    """MODEL_GRAPH inputs for a single scenario (scalars broadcast to 1-D rows)."""
+    inputs: Dict[str, Any] = dict(zip(SCALE_KEYS, normalized_params(params)))
+    inputs["baseline"] = get_baseline(params)
+    return inputs
 
-        if new_users > 0:
-            cac_total.append(acq_spend / new_users)
-        else:
-            cac_total.append(0.0)
 
-        if new_paying > 0:
-            cac_paying.append(acq_spend / new_paying)
-        else:
-            cac_paying.append(0.0)
+def model_state(params: Dict[str, Any]) -> GraphState:
+    """
+    Cached MODEL_GRAPH evaluation of one scenario for incremental updates.
 
-    # For reasonability & charts we expose "cac" as CAC per paying customer
-    cac_for_charts = cac_paying
+    state.update(scale_inputs(new_params)) re-evaluates only the rows
+    downstream of the scales that changed (e.g. a marketing_scale change
+    touches marketing_total, the space clamp, profit, CAC and ROAS);
+    batch_from_graph(state.values, 1) gives the batch layout.
+    """
+    return GraphState(MODEL_GRAPH, scale_inputs(params))
 
-    # === 5) ROAS ===
 
-    roas: List[float] = []
-    for i in range(len(YEARS)):
-        mkt = marketing_total[i]
-        if mkt > 0:
-            roas.append(revenues[i] / mkt)
-        else:
-            roas.append(0.0)
+def batch_from_graph(values: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """compute_financials_batch layout from evaluated MODEL_GRAPH values."""
+    baseline = values["baseline"]
+    shape = (n, baseline.periods)
+    batch: Dict[str, np.ndarray] = {"years": baseline.period_labels}
+    for name in BATCH_SERIES:
+        value = values[name]
+        batch[name] = value if value.shape == shape else np.broadcast_to(value, shape).copy()
+    batch["cac"] = batch["cac_paying"]
+    return batch
 
-    # === 6) Build debug table (one row per year) ===
 
-    debug_table: List[Dict[str, float]] = []
-    for idx, year in enumerate(YEARS):
-        debug_table.append(
-            {
-                "year": year,
-                "mau": mau[idx],
-                "game_revenue": game_rev[idx],
-                "formation_revenue": formation_rev[idx],
-                "xr_revenue": rev_xr[idx],
-                "total_revenue": revenues[idx],
-                "marketing_total": marketing_total[idx],
-                "salaries": cost_salaries[idx],
-                "services_hw": cost_hw[idx],
-                "web3_cost": cost_web3[idx],
-                "game_dev_cost": cost_game_dev[idx],
-                "formation_cost": cost_formation[idx],
-                "prices_cost": BASE_COST_PRICES[idx],
-                "space_cost_used": space_cost_used[idx],
-                "total_cost": total_costs[idx],
-                "profit_before_space": profit_before_space[idx],
-                "profit": profit[idx],
-                "new_users": new_users_raw[idx],
-                "new_paying_users": new_paying_users[idx],
-                "cac_total": cac_total[idx],
-                "cac_paying": cac_paying[idx],
-                "roas": roas[idx],
-                "staff": staff[idx],
-            }
-        )
+def compute_financials_batch(
+    params: Union[Sequence[Dict[str, Any]], np.ndarray],
+    baseline: Optional[Baseline] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized counterpart of compute_financials.
+
+    Evaluates N parameter sets in one pass of MODEL_GRAPH over the horizon
+    of `baseline` (get_baseline(); the sheet's YEARS by default; per-scenario
+    horizon keys are ignored). Every series is an (N, horizon) array whose
+    rows match compute_financials bit-for-bit. Besides the keys of the scalar payload (minus
+    "debug_table") the result carries the extra debug series, so
+    batch_payload() can rebuild the scalar payload of any row.
+    """
 
-    # === 7) Final results payload ===
+    timer = stage_timer("compute_financials_batch")
+    scales = scales_matrix(params)
+    inputs = graph_inputs(scales, baseline)
+    if timer is not None:
+        timer.mark("inputs")
+    values = MODEL_GRAPH.evaluate(inputs)
+    if timer is not None:
+        timer.mark("graph")
+    batch = batch_from_graph(values, scales.shape[0])
+    if timer is not None:
+        timer.mark("payload")
+    return batch
+
+
+def batch_payload(batch: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+    """
+    Rebuild the compute_financials payload (lists + debug_table) for one row
+    of a compute_financials_batch result.
+    """
+
+    row = {
+        key: values[index].tolist()
+        for key, values in batch.items()
+        if key != "years"
+    }
+    years = batch["years"].tolist()
+
+    # Same columns as compute_financials' debug rows (batch names where they differ)
+    columns = [years] + [row[_BATCH_DEBUG_KEYS.get(key, key)] for key in _DEBUG_KEYS[1:]]
+    debug_table = [dict(zip(_DEBUG_KEYS, values)) for values in zip(*columns)]
 
     return {
-        "years": YEARS,
-        "mau": mau,
-        "revenues": revenues,
-        "costs": total_costs,
-        "profit": profit,
-        "staff": staff,
-        "roas": roas,
-        "cac": cac_for_charts,          # CAC per paying customer
-        "cac_total": cac_total,         # CAC per new user
-        "cac_paying": cac_paying,       # explicit alias
-        "game_revenue": game_rev,
-        "formation_revenue": formation_rev,
-        "xr_revenue": rev_xr,
-        "marketing_total": marketing_total,
-        "space_cost_used": space_cost_used,
-        "profit_before_space": profit_before_space,
+        "years": years,
+        "mau": row["mau"],
+        "revenues": row["revenues"],
+        "costs": row["costs"],
+        "profit": row["profit"],
+        "staff": row["staff"],
+        "roas": row["roas"],
+        "cac": row["cac"],
+        "cac_total": row["cac_total"],
+        "cac_paying": row["cac_paying"],
+        "game_revenue": row["game_revenue"],
+        "formation_revenue": row["formation_revenue"],
+        "xr_revenue": row["xr_revenue"],
+        "marketing_total": row["marketing_total"],
+        "space_cost_used": row["space_cost_used"],
+        "profit_before_space": row["profit_before_space"],
         "debug_table": debug_table,
     }
@@ -0,0 +1,144 @@
+from typing import Dict, Any, Callable, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+
+class Row(NamedTuple):
+    """
+    One named row of the model.
+
+    formula is called with the values of `deps` (inputs or other rows), in
+    order, and returns the row value. excel_row documents the sheet row the
+    formula reproduces, when there is one.
+    """
+
+    name: str
+    deps: Tuple[str, ...]
+    formula: Callable[..., Any]
+    excel_row: Optional[str] = None
+
+
+class FormulaGraph:
+    """
+    Dependency graph of named rows compiled into evaluation plans.
+
+    The full plan is a topological order of the rows; for any set of changed
+    inputs, plan() returns just the rows downstream of them, still in
+    topological order, so a GraphState can refresh its cached values by
+    re-evaluating only what depends on the change.
+    """
+
+    def __init__(self, inputs: Sequence[str], rows: Sequence[Row]):
+        self.inputs: Tuple[str, ...] = tuple(inputs)
+        self.rows: Dict[str, Row] = {}
+        for row in rows:
+            if row.name in self.rows or row.name in self.inputs:
+                raise ValueError(f"Duplicate row name {row.name!r}")
+            self.rows[row.name] = row
+
+        known = set(self.inputs) | set(self.rows)
+        for row in rows:
+            missing = [d for d in row.deps if d not in known]
+            if missing:
+                raise ValueError(f"Row {row.name!r} depends on unknown {missing}")
+
+        self.order: List[Row] = self._topological_order()
+
+        # Direct dependents of every input / row
+        self._dependents: Dict[str, Set[str]] = {name: set() for name in known}
+        for row in rows:
+            for dep in row.deps:
+                self._dependents[dep].add(row.name)
+
+        self._plans: Dict[FrozenSet[str], List[Row]] = {}
+
+    def _topological_order(self) -> List[Row]:
+        order: List[Row] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str) -> None:
+            if name in self.inputs or state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle through row {name!r}")
+            state[name] = 1
+            row = self.rows[name]
+            for dep in row.deps:
+                visit(dep)
+            state[name] = 2
+            order.append(row)
+
+        for name in self.rows:
+            visit(name)
+        return order
+
+    def downstream(self, changed: Iterable[str]) -> Set[str]:
+        """Names of all rows that (transitively) depend on `changed`."""
+        seen: Set[str] = set()
+        stack = list(changed)
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def plan(self, changed: Iterable[str]) -> List[Row]:
+        """Rows to re-evaluate, in order, after `changed` inputs/rows change."""
+        key = frozenset(changed)
+        plan = self._plans.get(key)
+        if plan is None:
+            dirty = self.downstream(key)
+            plan = [row for row in self.order if row.name in dirty]
+            self._plans[key] = plan
+        return plan
+
+    def evaluate(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate every row from scratch; returns inputs and rows by name."""
+        missing = [name for name in self.inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing graph inputs {missing}")
+        values = dict(inputs)
+        _run(self.order, values)
+        return values
+
+
+def _run(plan: List[Row], values: Dict[str, Any]) -> None:
+    for row in plan:
+        values[row.name] = row.formula(*[values[dep] for dep in row.deps])
+
+
+class GraphState:
+    """
+    Cached values of a FormulaGraph for one set of inputs.
+
+    update() takes new values for some inputs and re-evaluates only the
+    rows downstream of the inputs that actually changed, reusing every
+    cached upstream value.
+    """
+
+    def __init__(
+        self,
+        graph: FormulaGraph,
+        inputs: Dict[str, Any],
+        same: Callable[[Any, Any], bool] = lambda a, b: a == b,
+    ):
+        self.graph = graph
+        self.same = same
+        self.values = graph.evaluate(inputs)
+
+    def update(self, changes: Dict[str, Any]) -> List[str]:
+        """Apply input changes; returns the names of the re-evaluated rows."""
+        unknown = [name for name in changes if name not in self.graph.inputs]
+        if unknown:
+            raise ValueError(f"Unknown graph inputs {unknown}")
+
+        changed = [
+            name for name, value in changes.items() if not self.same(self.values[name], value)
+        ]
+        if not changed:
+            return []
+
+        for name in changed:
+            self.values[name] = changes[name]
+        plan = self.graph.plan(changed)
+        _run(plan, self.values)
+        return [row.name for row in plan]
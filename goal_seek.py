@@ -0,0 +1,122 @@
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from financial_engine import (
+    SCALE_KEYS,
+    Baseline,
+    compute_financials_batch,
+    get_baseline,
+    scales_matrix,
+)
+from metrics import evaluate_metric, to_json_value
+
+
+def _evaluate(
+    base_row: np.ndarray,
+    columns: Sequence[int],
+    factors: np.ndarray,
+    metric: str,
+    year: Optional[int],
+    baseline: Baseline,
+) -> np.ndarray:
+    # One batched engine pass with the chosen scales multiplied by each factor
+    rows = np.tile(base_row, (len(factors), 1))
+    rows[:, columns] *= factors[:, None]
+    return evaluate_metric(compute_financials_batch(rows, baseline), metric, year)
+
+
+def goal_seek(
+    target: float,
+    metric: str,
+    variables: Sequence[str],
+    base: Optional[Dict[str, Any]] = None,
+    year: Optional[int] = None,
+    low: float = 0.0,
+    high: float = 5.0,
+    points: int = 64,
+    tol: float = 1e-9,
+    max_iter: int = 20,
+) -> Dict[str, Any]:
+    """
+    Solve for a common factor applied to `variables` so that `metric`
+    (see metrics.evaluate_metric) reaches `target`.
+
+    The factor multiplies the base values of the chosen scales. [low, high]
+    is scanned with `points` factors in one batched pass to bracket the
+    first crossing of the target, then the bracket is narrowed the same way
+    (each pass shrinks it by points - 1) until it is narrower than `tol`.
+    Scanning instead of assuming monotonicity matters because the space
+    system rule makes profit flat or non-monotonic over some ranges.
+
+    The returned factor is the edge of the crossing where metric >= target:
+    the smallest feasible factor when the metric increases (e.g. MAU needed
+    to be profitable), the largest one when it decreases (e.g. how far
+    marketing can grow while keeping total profit above a floor).
+    """
+    unknown = set(variables) - set(SCALE_KEYS)
+    if not variables or unknown:
+        raise ValueError(f"variables must be a non-empty subset of {SCALE_KEYS}")
+    if not 0 <= low < high:
+        raise ValueError("need 0 <= low < high")
+    if points < 3:
+        raise ValueError("points must be >= 3")
+
+    target = float(target)
+    base_row = scales_matrix([base or {}])[0]
+    columns = [SCALE_KEYS.index(v) for v in variables]
+    baseline = get_baseline(base)
+
+    factors = np.linspace(low, high, points)
+    values = _evaluate(base_row, columns, factors, metric, year, baseline)
+    above = values >= target
+    evaluations = points
+    iterations = 1
+
+    # First adjacent pair of factors on opposite sides of the target
+    flips = np.flatnonzero(above[:-1] != above[1:])
+    if flips.size == 0:
+        best = int(np.nanargmin(np.abs(values - target))) if not np.isnan(values).all() else 0
+        return {
+            "status": "not_bracketed",
+            "satisfied": bool(above.all()),
+            "factor": float(factors[best]),
+            "scales": {v: float(base_row[j] * factors[best]) for v, j in zip(variables, columns)},
+            "metric": metric,
+            "year": year,
+            "target": target,
+            "achieved": to_json_value(values[best]),
+            "iterations": iterations,
+            "evaluations": evaluations,
+        }
+
+    k = int(flips[0])
+    lo, hi = factors[k], factors[k + 1]
+    increasing = bool(above[k + 1])
+
+    while hi - lo > tol and iterations < max_iter:
+        factors = np.linspace(lo, hi, points)
+        above = _evaluate(base_row, columns, factors, metric, year, baseline) >= target
+        evaluations += points
+        iterations += 1
+        k = int(np.flatnonzero(above[:-1] != above[1:])[0])
+        lo, hi = factors[k], factors[k + 1]
+
+    factor = hi if increasing else lo
+    achieved = _evaluate(base_row, columns, np.array([factor]), metric, year, baseline)[0]
+    evaluations += 1
+
+    return {
+        "status": "solved",
+        "satisfied": True,
+        "factor": float(factor),
+        "scales": {v: float(base_row[j] * factor) for v, j in zip(variables, columns)},
+        "metric": metric,
+        "year": year,
+        "target": target,
+        "achieved": to_json_value(achieved),
+        "direction": "increasing" if increasing else "decreasing",
+        "bracket": [float(lo), float(hi)],
+        "iterations": iterations,
+        "evaluations": evaluations,
+    }
@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Any, List, Mapping, Optional, Sequence
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Content codings offered to clients, in order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Smaller bodies are sent as is (compression would not pay for its header)
+MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Query arguments that select the response format, not model parameters
+FORMAT_ARGS = ("fields", "layout", "precision", "encoding")
+
+
+def etag(*parts: Any) -> str:
+    """
+    Strong entity tag (unquoted) of a response fully determined by `parts`:
+    stable across processes and restarts, unlike hash().
+    """
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def representation_etag(tag: str, coding: Optional[str]) -> str:
+    """Each content coding is a distinct representation with its own strong tag."""
+    return f"{tag}-{coding}" if coding else tag
+
+
+def representation_etags(tag: str) -> List[str]:
+    """Tags of every representation of the same content (any of them allows a 304)."""
+    return [tag] + [representation_etag(tag, coding) for coding in ENCODINGS]
+
+
+def compress(body: bytes, coding: Optional[str]) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the bytes identical for identical bodies
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return body
+
+
+def choose_coding(offered: Sequence[str], size: int) -> Optional[str]:
+    """Content coding to use given the client's preference-ordered choices."""
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    for coding in offered:
+        if coding in ENCODINGS:
+            return coding
+        if coding == "*":
+            return ENCODINGS[0]
+    return None
+
+
+def query_params(args: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Model parameters of a GET request: every query argument except the
+    format ones, JSON-decoded when possible (numbers, objects such as
+    extrapolation or retention) and kept as a string otherwise.
+    """
+    params: Dict[str, Any] = {}
+    for name, value in args.items():
+        if name in FORMAT_ARGS:
+            continue
+        try:
+            params[name] = json.loads(value)
+        except ValueError:
+            params[name] = value
+    return params
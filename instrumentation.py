@@ -0,0 +1,128 @@
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+# Request latency / payload size histograms (METRICS_ENABLED, on by default)
+# and engine stage timers (STAGE_TIMERS, off by default: they cost a few
+# clock reads per model run), rendered in the Prometheus text format.
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+STAGE_TIMERS = os.environ.get("STAGE_TIMERS", "0") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (1e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 0.1, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for key, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Request latency of the instrumented endpoints.",
+    ("endpoint", "status"),
+    LATENCY_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_size_bytes",
+    "Response body size of the instrumented endpoints.",
+    ("endpoint",),
+    SIZE_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "engine_stage_duration_seconds",
+    "Time spent per stage of the model engine (STAGE_TIMERS=1).",
+    ("function", "stage"),
+    STAGE_BUCKETS,
+)
+
+HISTOGRAMS = [REQUEST_SECONDS, RESPONSE_BYTES, STAGE_SECONDS]
+
+
+class StageTimer:
+    """Records the time since the previous mark (or creation) under each stage name."""
+
+    __slots__ = ("function", "_last")
+
+    def __init__(self, function: str):
+        self.function = function
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self._last, self.function, stage)
+        self._last = now
+
+
+def stage_timer(function: str) -> Optional[StageTimer]:
+    """A StageTimer when STAGE_TIMERS is on, else None (callers skip their marks)."""
+    return StageTimer(function) if STAGE_TIMERS else None
+
+
+def render_samples(
+    name: str, kind: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]]
+) -> List[str]:
+    """Exposition lines of a counter / gauge from (labels, value) samples."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return lines
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """Every histogram plus `extra` exposition lines, as a /metrics body."""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,174 @@
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterable, List, Optional
+
+from financial_engine import (
+    BASELINE_PARAMS,
+    BATCH_SERIES,
+    SCALE_KEYS,
+    model_state,
+    normalized_params,
+    scale_inputs,
+)
+from metrics import to_json_list
+from reasonability import evaluate_reasonability
+
+
+class LiveSession:
+    """
+    Server-side state of one analyst's slider session.
+
+    Slider deltas are merged into a pending parameter set; the consumer
+    (the session's event stream) computes only the latest pending state,
+    so a burst of slider events costs one incremental MODEL_GRAPH update,
+    and only the rows that update re-evaluated are converted again. Each
+    update reports only the series and reasonability colors whose values
+    differ from what the client already has.
+
+    The BASELINE_PARAMS (horizon, extrapolation, retention) are fixed when
+    the session is created; deltas only move the SCALE_KEYS sliders. Any
+    other parameter is rejected rather than silently ignored.
+    """
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        params = params or {}
+        unknown = set(params) - set(SCALE_KEYS) - set(BASELINE_PARAMS)
+        if unknown:
+            raise ValueError(f"Unsupported live session params: {sorted(unknown)}")
+
+        self.id = uuid.uuid4().hex
+        self.base = {key: params[key] for key in BASELINE_PARAMS if key in params}
+        self.params = dict(zip(SCALE_KEYS, normalized_params(params)))
+        self.state = model_state(dict(self.params, **self.base))
+        self.seq = 0  # deltas received
+        self.applied_seq = 0  # deltas reflected in the last computed update
+        self.last_seen = time.monotonic()
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._cond = threading.Condition()
+        self._compute = threading.Lock()  # graph state and diff baseline
+        self._series: Dict[str, List[Any]] = {}  # JSON lists of the graph state
+        self._convert(BATCH_SERIES)
+        self._sent_series: Dict[str, List[float]] = {}
+        self._sent_colors: Dict[str, List[str]] = {}
+        self.closed = False
+
+    def submit(self, delta: Dict[str, Any]) -> int:
+        """Queue a slider delta; returns its sequence number."""
+        unknown = set(delta) - set(SCALE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown params: {sorted(unknown)}")
+
+        with self._cond:
+            merged = dict(self._pending or self.params)
+            merged.update(delta)
+            self._pending = merged
+            self.seq += 1
+            self.last_seen = time.monotonic()
+            self._cond.notify_all()
+            return self.seq
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full current state; resets the diff baseline (used on (re)connect)."""
+        with self._compute:
+            self._sent_series = {}
+            self._sent_colors = {}
+            return self._message()
+
+    def next_update(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Block until deltas are pending (or `timeout` expires, returning None),
+        then compute the latest parameter set and return only what changed.
+        """
+        with self._cond:
+            if self._pending is None and not self.closed:
+                self._cond.wait(timeout)
+            if self._pending is None:
+                return None
+            pending, self._pending = self._pending, None
+            seq = self.seq
+
+        with self._compute:
+            self.params = dict(zip(SCALE_KEYS, normalized_params(pending)))
+            self._convert(self.state.update(scale_inputs(dict(self.params, **self.base))))
+            self.applied_seq = seq
+            return self._message()
+
+    def _convert(self, rows: Iterable[str]) -> None:
+        # NaN -> None so unchanged series compare equal and serialize as JSON
+        values = self.state.values
+        for name in rows:
+            if name in BATCH_SERIES:
+                self._series[name] = to_json_list(values[name])
+
+    def _message(self) -> Dict[str, Any]:
+        # One scenario: every graph row is already a (periods,) array
+        state = self.state.values
+        years = state["baseline"].period_labels.tolist()
+        row = {name: state[name] for name in BATCH_SERIES}
+        colors = evaluate_reasonability({"years": years, "cac": row["cac_paying"], **row})
+        series = self._series
+
+        changed_series = {
+            name: values for name, values in series.items() if self._sent_series.get(name) != values
+        }
+        changed_colors = {
+            name: values for name, values in colors.items() if self._sent_colors.get(name) != values
+        }
+        self._sent_series.update(changed_series)
+        self._sent_colors.update(changed_colors)
+
+        return {
+            "seq": self.applied_seq,
+            "params": dict(self.params, **self.base),
+            "years": years,
+            "series": changed_series,
+            "reasonability": changed_colors,
+        }
+
+
+class SessionManager:
+    """Registry of live sessions; sessions idle for `ttl` seconds are dropped."""
+
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, LiveSession] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for sid, session in list(self._sessions.items()):
+            if now - session.last_seen > self.ttl:
+                session.close()
+                del self._sessions[sid]
+
+    def create(self, params: Optional[Dict[str, Any]] = None) -> LiveSession:
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError("Too many live sessions")
+            session = LiveSession(params)
+            self._sessions[session.id] = session
+            return session
+
+    def get(self, sid: str) -> Optional[LiveSession]:
+        with self._lock:
+            session = self._sessions.get(sid)
+        if session is not None:
+            session.last_seen = time.monotonic()
+        return session
+
+    def close(self, sid: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is None:
+            return False
+        session.close()
+        return True
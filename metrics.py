@@ -0,0 +1,119 @@
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+from valuation import DEFAULT_DISCOUNT_RATE, discounted_cumulative, irr, max_burn, npv
+
+# Summary outputs computed over a compute_financials_batch result.
+# Every metric returns one value per scenario; NaN means "never happened"
+# (e.g. no profitable year) and is serialized as null.
+
+
+def _year_index(batch: Dict[str, np.ndarray], year: Optional[int]) -> int:
+    years = batch["years"].tolist()
+    if year is None:
+        return len(years) - 1
+    if year not in years:
+        raise ValueError(f"year must be one of {years[0]}..{years[-1]}")
+    return years.index(year)
+
+
+def _first_year(batch: Dict[str, np.ndarray], mask: np.ndarray) -> np.ndarray:
+    # Year of the first True per row, NaN if the row has none
+    years = batch["years"].astype(float)
+    first = years[np.argmax(mask, axis=1)]
+    return np.where(mask.any(axis=1), first, np.nan)
+
+
+def total_profit(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    return batch["profit"].sum(axis=1)
+
+
+def first_profitable_year(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    return _first_year(batch, batch["profit"] > 0)
+
+
+def breakeven_year(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    """First year in which cumulative profit turns positive."""
+    return _first_year(batch, np.cumsum(batch["profit"], axis=1) > 0)
+
+
+def peak_cumulative_loss(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    """Deepest cumulative loss over the horizon (0 if never below zero)."""
+    return max_burn(batch["profit"])
+
+
+def payback_year(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    """First year in which discounted cumulative profit turns positive."""
+    return _first_year(batch, discounted_cumulative(batch["profit"], DEFAULT_DISCOUNT_RATE) > 0)
+
+
+def net_present_value(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    return npv(batch["profit"], DEFAULT_DISCOUNT_RATE)
+
+
+def internal_rate_of_return(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    return irr(batch["profit"])
+
+
+def min_annual_profit(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    return batch["profit"].min(axis=1)
+
+
+def _at_year(field: str) -> Callable[[Dict[str, np.ndarray], Optional[int]], np.ndarray]:
+    def metric(batch: Dict[str, np.ndarray], year: Optional[int] = None) -> np.ndarray:
+        return batch[field][:, _year_index(batch, year)]
+
+    return metric
+
+
+def _cumulative_profit(batch: Dict[str, np.ndarray], year: Optional[int] = None) -> np.ndarray:
+    return batch["profit"][:, : _year_index(batch, year) + 1].sum(axis=1)
+
+
+# Whole-horizon metrics
+METRICS: Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]] = {
+    "total_profit": total_profit,
+    "first_profitable_year": first_profitable_year,
+    "breakeven_year": breakeven_year,
+    "min_annual_profit": min_annual_profit,
+    "peak_cumulative_loss": peak_cumulative_loss,
+    # Valuation at DEFAULT_DISCOUNT_RATE (see valuation.py)
+    "npv": net_present_value,
+    "irr": internal_rate_of_return,
+    "payback_year": payback_year,
+}
+
+# Metrics read at a given year (last year when not specified)
+YEAR_METRICS: Dict[str, Callable[[Dict[str, np.ndarray], Optional[int]], np.ndarray]] = {
+    "revenue": _at_year("revenues"),
+    "costs": _at_year("costs"),
+    "profit": _at_year("profit"),
+    "roas": _at_year("roas"),
+    "cumulative_profit": _cumulative_profit,
+}
+
+
+def metric_names() -> List[str]:
+    return sorted(METRICS) + sorted(YEAR_METRICS)
+
+
+def evaluate_metric(
+    batch: Dict[str, np.ndarray], name: str, year: Optional[int] = None
+) -> np.ndarray:
+    """Values of metric `name` for every scenario of `batch`."""
+    if name in METRICS:
+        return METRICS[name](batch)
+    if name in YEAR_METRICS:
+        return YEAR_METRICS[name](batch, year)
+    raise ValueError(f"Unknown metric {name!r}, expected one of {metric_names()}")
+
+
+def to_json_value(value: float) -> Optional[float]:
+    """Plain float for JSON, None for NaN."""
+    return None if np.isnan(value) else float(value)
+
+
+def to_json_list(values: np.ndarray) -> List[Any]:
+    """tolist() with NaN mapped to None so the result is valid JSON."""
+    return np.where(np.isnan(values), None, values.astype(object)).tolist()
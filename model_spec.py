@@ -0,0 +1,55 @@
+from typing import Dict, Any, Optional
+
+from financial_engine import (
+    ENGINE_VERSION,
+    RECURRENCY,
+    SCALE_KEYS,
+    YEAR_COEFFS,
+    baseline_key,
+    baseline_source,
+    get_baseline,
+)
+from reasonability import get_rules
+
+# Bumped whenever the layout below or the evaluation it implies changes, so
+# a client can refuse a spec it does not know how to evaluate
+SPEC_FORMAT = 1
+
+
+def model_spec(params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Everything a client needs to evaluate compute_financials locally for
+    the baseline requested by params (horizon, extrapolation, retention):
+    the per-year coefficient rows in YEAR_COEFFS order, the constants of
+    the non-linear rules and the reasonability rule table.
+
+    Floats survive the JSON round trip exactly, so an evaluator repeating
+    the operations of compute_financials in the same order (see
+    static/js/local_model.js) reproduces its results to the last bit.
+    """
+    params = params or {}
+    baseline = get_baseline(params)
+    rules = get_rules()
+    return {
+        "format": SPEC_FORMAT,
+        "engine_version": ENGINE_VERSION,
+        "baseline_source": baseline_source(),
+        "scale_keys": list(SCALE_KEYS),
+        "years": baseline.year_list,
+        "constants": {
+            # Per period (already pro-rated for sub-annual baselines)
+            "space_min_profit": baseline.space_min_profit,
+            # Already applied in the new_users coefficients; informative
+            "recurrency": RECURRENCY,
+        },
+        "coefficients": {name: getattr(baseline, name).tolist() for name in YEAR_COEFFS},
+        "reasonability": {
+            "fingerprint": rules.fingerprint,
+            "metrics": rules.spec["metrics"],
+        },
+    }
+
+
+def spec_key(params: Optional[Dict[str, Any]] = None) -> tuple:
+    """What model_spec(params) depends on (for caching and ETags)."""
+    return (SPEC_FORMAT, ENGINE_VERSION, baseline_key(params or {}), get_rules().fingerprint)
@@ -0,0 +1,209 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from financial_engine import (
+    SCALE_KEYS,
+    BaselineKey,
+    baseline_for_key,
+    baseline_key,
+    compute_financials_batch,
+    scales_matrix,
+    source_rows,
+)
+from parallel import SharedArrays, map_chunks, use_pool
+from valuation import DEFAULT_DISCOUNT_RATE, VALUATION_METRICS, valuation
+
+DISTRIBUTIONS = ("normal", "lognormal", "triangular", "uniform")
+
+# Series summarized into percentile bands
+BAND_FIELDS = ["revenues", "costs", "profit", "cumulative_profit"]
+
+DEFAULT_PERCENTILES = [5.0, 50.0, 95.0]
+
+
+def _param(spec: Dict[str, Any], name: str, default: Optional[float] = None) -> float:
+    value = spec.get(name, default)
+    if value is None:
+        raise ValueError(f"'{spec.get('dist')}' distribution requires '{name}'")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number") from None
+
+
+def _draw(spec: Dict[str, Any], base: float, size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw `size` samples of one scale driver.
+
+    Supported specs (location parameters default to the base slider value):
+      - {"dist": "normal", "mean": 1.0, "std": 0.1}
+      - {"dist": "lognormal", "median": 1.0, "sigma": 0.2}
+      - {"dist": "triangular", "low": 0.8, "mode": 1.0, "high": 1.3}
+      - {"dist": "uniform", "low": 0.8, "high": 1.2}
+    """
+    dist = spec.get("dist")
+
+    if dist == "normal":
+        std = _param(spec, "std")
+        if std < 0:
+            raise ValueError("'std' must be >= 0")
+        return rng.normal(_param(spec, "mean", base), std, size)
+
+    if dist == "lognormal":
+        median = _param(spec, "median", base)
+        sigma = _param(spec, "sigma")
+        if median <= 0 or sigma < 0:
+            raise ValueError("lognormal needs 'median' > 0 and 'sigma' >= 0")
+        return rng.lognormal(np.log(median), sigma, size)
+
+    if dist == "triangular":
+        low = _param(spec, "low")
+        high = _param(spec, "high")
+        mode = _param(spec, "mode", base)
+        if not low <= mode <= high or low == high:
+            raise ValueError("triangular needs 'low' <= 'mode' <= 'high' and 'low' < 'high'")
+        return rng.triangular(low, mode, high, size)
+
+    if dist == "uniform":
+        low = _param(spec, "low")
+        high = _param(spec, "high")
+        if low > high:
+            raise ValueError("uniform needs 'low' <= 'high'")
+        return rng.uniform(low, high, size)
+
+    raise ValueError(f"Unknown distribution {dist!r}, expected one of {DISTRIBUTIONS}")
+
+
+def sample_scales(
+    drivers: Dict[str, Dict[str, Any]],
+    size: int,
+    rng: np.random.Generator,
+    base: Optional[Dict[str, Any]] = None,
+) -> np.ndarray:
+    """
+    (size, len(SCALE_KEYS)) matrix of sampled scales. Drivers without a
+    distribution stay at their base value (1.0 unless given in `base`).
+    """
+    unknown = set(drivers) - set(SCALE_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown drivers: {sorted(unknown)}")
+
+    base_row = scales_matrix([base or {}])[0]
+    scales = np.tile(base_row, (size, 1))
+    for j, key in enumerate(SCALE_KEYS):
+        spec = drivers.get(key)
+        if spec is not None:
+            if not isinstance(spec, dict):
+                raise ValueError(f"Distribution for {key!r} must be an object")
+            scales[:, j] = _draw(spec, base_row[j], size, rng)
+    return scales
+
+
+def _evaluate_chunk(
+    arrays: Dict[str, np.ndarray],
+    start: int,
+    stop: int,
+    key: BaselineKey,
+    base_rows: Dict[str, Any],
+    discount_rate: float,
+    initial_cash: float,
+) -> None:
+    # Draws start:stop of arrays["scales"] into the band and valuation arrays
+    batch = compute_financials_batch(arrays["scales"][start:stop], baseline_for_key(key, base_rows))
+    arrays["revenues"][start:stop] = batch["revenues"]
+    arrays["costs"][start:stop] = batch["costs"]
+    arrays["profit"][start:stop] = batch["profit"]
+    np.cumsum(batch["profit"], axis=1, out=arrays["cumulative_profit"][start:stop])
+    for name, values in valuation(batch, discount_rate, initial_cash).items():
+        arrays[name][start:stop] = values
+
+
+def run_monte_carlo(
+    drivers: Dict[str, Dict[str, Any]],
+    draws: int = 100_000,
+    seed: Optional[int] = None,
+    base: Optional[Dict[str, Any]] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    chunk_size: int = 25_000,
+    discount_rate: float = DEFAULT_DISCOUNT_RATE,
+    initial_cash: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo over the scale drivers.
+
+    Draws are evaluated in chunks with compute_financials_batch (negative
+    draws are clamped to 0 like any slider value), across the process pool
+    for large runs (see parallel.py); only the band fields are kept, so
+    memory is draws × years per field. Returns per-year percentile
+    bands, e.g. bands["profit"]["p5"] -> list over the years of the horizon
+    requested by `base` (see financial_engine.baseline_key).
+
+    valuation holds percentiles over the draws of each valuation metric
+    (see valuation.valuation), e.g. valuation["irr"]["p50"]; draws where a
+    metric is undefined (no IRR, no payback...) are left out, and
+    valuation_defined gives the share of draws where it is defined.
+    """
+    if draws < 1:
+        raise ValueError("'draws' must be >= 1")
+    percentiles = [float(q) for q in percentiles]
+    if any(not 0 <= q <= 100 for q in percentiles):
+        raise ValueError("percentiles must be within [0, 100]")
+
+    rng = np.random.default_rng(seed)
+    key = baseline_key(base or {})
+    baseline = baseline_for_key(key)
+    shapes = {"scales": (draws, len(SCALE_KEYS))}
+    shapes.update((field, (draws, baseline.horizon)) for field in BAND_FIELDS)
+    shapes.update((name, (draws,)) for name in VALUATION_METRICS)
+
+    with SharedArrays(shapes, use_pool(draws)) as arrays:
+        arrays["scales"][:] = sample_scales(drivers, draws, rng, base)
+        chunks = map_chunks(
+            _evaluate_chunk,
+            arrays,
+            0,
+            draws,
+            chunk_size,
+            key=key,
+            base_rows=source_rows(key[-1]),
+            discount_rate=discount_rate,
+            initial_cash=initial_cash,
+        )
+        for _ in chunks:  # wait for every chunk
+            pass
+        bands, summary, defined = _summarize(arrays, draws, percentiles)
+
+    return {
+        "years": baseline.year_list,
+        "draws": draws,
+        "percentiles": percentiles,
+        "bands": bands,
+        "valuation": summary,
+        "valuation_defined": defined,
+    }
+
+
+def _summarize(
+    arrays: SharedArrays, draws: int, percentiles: List[float]
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+    # Exact percentiles over all draws (bands per year, valuation overall)
+    bands: Dict[str, Dict[str, List[float]]] = {}
+    for field in BAND_FIELDS:
+        levels = np.percentile(arrays[field], percentiles, axis=0)
+        bands[field] = {
+            f"p{q:g}": level.tolist() for q, level in zip(percentiles, levels)
+        }
+
+    summary: Dict[str, Any] = {}
+    defined: Dict[str, float] = {}
+    for name in VALUATION_METRICS:
+        values = arrays[name]
+        values = values[~np.isnan(values)]
+        defined[name] = values.size / draws
+        levels = np.percentile(values, percentiles) if values.size else [None] * len(percentiles)
+        summary[name] = {
+            f"p{q:g}": None if level is None else float(level)
+            for q, level in zip(percentiles, levels)
+        }
+    return bands, summary, defined
@@ -0,0 +1,228 @@
+import functools
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from cohorts import RetentionKey
+from financial_engine import (
+    BASE_ROWS,
+    BATCH_SERIES,
+    MODEL_GRAPH,
+    Baseline,
+    Rules,
+    baseline_key,
+    baseline_rows,
+    batch_payload,
+    graph_inputs,
+    scales_matrix,
+)
+
+MONTHS = 12
+
+# Monthly weights (mean 1, so a year keeps its annual total)
+SEASONALITY: Dict[str, List[float]] = {
+    "flat": [1.0] * MONTHS,
+    # Holiday peak in Nov-Dec, summer plateau
+    "gaming": [0.95, 0.85, 0.9, 0.9, 0.9, 0.95, 1.05, 1.05, 0.9, 0.95, 1.2, 1.4],
+    # Academic year: strong Sep-Jan, weak summer
+    "education": [1.2, 1.1, 1.1, 1.0, 0.9, 0.7, 0.5, 0.5, 1.3, 1.3, 1.2, 1.2],
+    # Spring and autumn event seasons
+    "events": [0.5, 0.7, 1.2, 1.3, 1.4, 1.2, 0.8, 0.4, 1.2, 1.4, 1.3, 0.6],
+}
+
+# Revenue / spend streams a seasonality profile can be assigned to
+SEASONAL_STREAMS: Dict[str, Tuple[str, ...]] = {
+    "game": ("rev_game",),
+    "formation": ("rev_formation",),
+    "events": ("rev_xr",),
+    "marketing": (
+        "marketing_events",
+        "marketing_sponsors",
+        "marketing_travels",
+        "marketing_publicity",
+    ),
+}
+
+# Baseline rows that are levels (held every month); all others are annual
+# flows split over the months
+STOCK_ROWS = ("mau", "staff_count", "conv_game", "conv_premium", "conv_small", "conv_cert")
+
+# Monthly series returned next to the annual roll-up
+MONTHLY_SERIES = [
+    "revenues",
+    "costs",
+    "profit",
+    "marketing_total",
+    "space_cost_used",
+    "mau",
+    "new_users",
+]
+
+# Annual roll-up: levels are averaged, ratios recomputed from the sums,
+# every other series summed
+_MEAN_SERIES = ("mau", "staff")
+_RATIO_SERIES = {
+    "roas": ("revenues", "marketing_total"),
+    "cac_total": ("marketing_total", "new_users"),
+    "cac_paying": ("marketing_total", "new_paying_users"),
+}
+
+SeasonalityKey = Tuple[Tuple[str, Tuple[float, ...]], ...]
+
+
+def seasonality_key(params: Dict[str, Any]) -> SeasonalityKey:
+    """
+    Validated, hashable params["seasonality"]: {stream: profile name or 12
+    weights}; streams not listed are flat. Weights are normalized to mean 1.
+    """
+    spec = params.get("seasonality") or {}
+    if not isinstance(spec, dict):
+        raise ValueError("seasonality must map streams to profiles")
+
+    key = []
+    for stream, profile in sorted(spec.items()):
+        if stream not in SEASONAL_STREAMS:
+            raise ValueError(f"Unknown stream {stream!r}, expected {sorted(SEASONAL_STREAMS)}")
+        if isinstance(profile, str):
+            if profile not in SEASONALITY:
+                raise ValueError(f"Unknown profile {profile!r}, expected {sorted(SEASONALITY)}")
+            profile = SEASONALITY[profile]
+        try:
+            weights = np.asarray(profile, dtype=float)
+        except (TypeError, ValueError):
+            weights = np.zeros(0)
+        if (
+            weights.shape != (MONTHS,)
+            or not np.isfinite(weights).all()
+            or (weights < 0).any()
+            or weights.sum() <= 0
+        ):
+            raise ValueError(
+                f"Seasonality of {stream!r} needs a profile or {MONTHS} finite weights >= 0"
+            )
+        key.append((stream, tuple((weights * (MONTHS / weights.sum())).tolist())))
+    return tuple(key)
+
+
+@functools.lru_cache(maxsize=32)
+def _monthly_baseline(
+    horizon: int,
+    rules: Rules,
+    retention: RetentionKey,
+    source: str,
+    seasonality: SeasonalityKey,
+) -> Baseline:
+    weights = {row: np.ones(MONTHS) for row in BASE_ROWS}
+    for stream, profile in seasonality:
+        for row in SEASONAL_STREAMS[stream]:
+            weights[row] = np.asarray(profile)
+
+    monthly = {}
+    for name, values in baseline_rows(horizon, rules, source).items():
+        if name in STOCK_ROWS:
+            monthly[name] = np.repeat(values, MONTHS)
+        else:
+            # (years, 1) × (1, months) → one row per year, flattened
+            monthly[name] = (values[:, None] / MONTHS * weights[name][None, :]).ravel()
+    return Baseline(monthly, periods_per_year=MONTHS, retention=retention)
+
+
+def monthly_baseline(params: Optional[Dict[str, Any]] = None) -> Baseline:
+    """Cached monthly Baseline for the baseline_key and seasonality of params."""
+    params = params or {}
+    return _monthly_baseline(*baseline_key(params), seasonality_key(params))
+
+
+def rollup(values: Dict[str, np.ndarray], baseline: Baseline, n: int) -> Dict[str, np.ndarray]:
+    """
+    Annual compute_financials_batch layout of n scenarios from monthly
+    MODEL_GRAPH values. Rows that are (periods,) (fixed costs) are rolled
+    up once and broadcast, not copied to (n, periods) first.
+    """
+    shape = (n, baseline.horizon)
+
+    annual: Dict[str, np.ndarray] = {"years": np.arange(1, baseline.horizon + 1)}
+    for name in BATCH_SERIES:
+        if name in _RATIO_SERIES:
+            continue
+        value = values[name]
+        # einsum sums the 12 months of a year in one pass, several times
+        # faster than .sum(axis=-1) on this short trailing axis
+        total = np.einsum("...ym->...y", value.reshape(value.shape[:-1] + (baseline.horizon, MONTHS)))
+        if name in _MEAN_SERIES:
+            total /= MONTHS
+        annual[name] = total if total.shape == shape else np.broadcast_to(total, shape).copy()
+    for name, (num, den) in _RATIO_SERIES.items():
+        # 0.0 where the denominator is 0, as in the engine
+        annual[name] = np.divide(
+            annual[num], annual[den], out=np.zeros(shape), where=annual[den] > 0
+        )
+    annual["cac"] = annual["cac_paying"]
+    return annual
+
+
+def compute_financials_monthly_batch(
+    params: Union[Sequence[Dict[str, Any]], np.ndarray],
+    baseline: Optional[Baseline] = None,
+    chunk_size: int = 256,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Run MODEL_GRAPH over 12 × horizon monthly periods for N parameter sets.
+
+    Annual flows of the baseline are split over the months by their
+    seasonality profile, levels (MAU, staff, conversion ratios) are held;
+    the space system threshold applies per month (SPACE_MIN_PROFIT / 12)
+    and RECURRENCY (or the retention curve) month over month. Returns (monthly, annual): the (N, 12·H)
+    MONTHLY_SERIES plus "cash_balance" (cumulative monthly profit), and
+    the annual roll-up of every series in the compute_financials_batch
+    layout.
+
+    Scenarios are evaluated chunk_size rows at a time so the monthly
+    intermediates stay in cache (whole-batch temporaries of N × 168 rows
+    cost several times more in page faults than in arithmetic). Each
+    scenario still costs 12× the cells of an annual run, so callers
+    budget monthly batches by baseline.periods (see app._over_budget).
+    """
+    baseline = baseline or monthly_baseline()
+    scales = scales_matrix(params)
+    n = scales.shape[0]
+    shape = (n, baseline.periods)
+
+    monthly: Dict[str, np.ndarray] = {"years": baseline.period_labels}
+    monthly.update((name, np.empty(shape)) for name in MONTHLY_SERIES + ["cash_balance"])
+    annual: Dict[str, np.ndarray] = {}
+    for start in range(0, max(n, 1), chunk_size):
+        stop = min(start + chunk_size, n)
+        values = MODEL_GRAPH.evaluate(graph_inputs(scales[start:stop], baseline))
+        for name in MONTHLY_SERIES:
+            monthly[name][start:stop] = values[name]
+        np.cumsum(monthly["profit"][start:stop], axis=1, out=monthly["cash_balance"][start:stop])
+
+        chunk = rollup(values, baseline, stop - start)
+        if start == 0 and stop == n:
+            annual = chunk
+            break
+        for name, value in chunk.items():
+            if name == "years":
+                annual[name] = value
+            else:
+                annual.setdefault(name, np.empty((n, baseline.horizon)))[start:stop] = value
+
+    return monthly, annual
+
+
+def compute_financials_monthly(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Monthly-granularity counterpart of compute_financials: the annual
+    payload (rolled up from the months, with debug_table) plus "months"
+    and "monthly" series (MONTHLY_SERIES and cash_balance).
+    """
+    baseline = monthly_baseline(params)
+    monthly, annual = compute_financials_monthly_batch([params], baseline)
+
+    payload = batch_payload(annual, 0)
+    payload["months"] = monthly["years"].tolist()
+    payload["monthly"] = {
+        name: monthly[name][0].tolist() for name in MONTHLY_SERIES + ["cash_balance"]
+    }
+    return payload
@@ -0,0 +1,179 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import instrumentation
+
+# Large batch jobs (Monte Carlo, sweeps) are split into chunks evaluated by
+# a process pool. Inputs and outputs live in shared memory: workers attach
+# to the blocks by name and write their rows in place, so only chunk bounds
+# and small options are pickled.
+
+WORKERS = int(os.environ.get("ENGINE_WORKERS", 0)) or len(os.sched_getaffinity(0))
+
+# Below this many rows the pool costs more than it saves
+MIN_PARALLEL_ROWS = int(os.environ.get("ENGINE_MIN_PARALLEL_ROWS", 200_000))
+
+Spec = Dict[str, Tuple[str, Tuple[int, ...]]]
+ChunkFn = Callable[..., None]
+
+# Imported by the forkserver before it forks any worker
+PRELOAD = ["monte_carlo", "sweep"]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def use_pool(rows: int) -> bool:
+    return WORKERS > 1 and rows >= MIN_PARALLEL_ROWS
+
+
+class SharedArrays:
+    """
+    Named float64 arrays, in shared memory when `shared` (else plain numpy
+    arrays, for the in-process path). Use as a context manager: the blocks
+    are released on exit, so copy anything returned past it.
+    """
+
+    def __init__(self, shapes: Dict[str, Tuple[int, ...]], shared: bool):
+        self.shared = shared
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+        for name, shape in shapes.items():
+            if shared:
+                size = max(int(np.prod(shape)) * 8, 1)
+                block = shared_memory.SharedMemory(create=True, size=size)
+                self._blocks.append(block)
+                self.arrays[name] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+            else:
+                self.arrays[name] = np.empty(shape)
+
+    @property
+    def spec(self) -> Spec:
+        """What a worker needs to attach: {array name: (block name, shape)}."""
+        return {
+            name: (block.name, array.shape)
+            for (name, array), block in zip(self.arrays.items(), self._blocks)
+        }
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def _run_attached(
+    fn: ChunkFn, spec: Spec, start: int, stop: int, kwargs: Dict[str, Any]
+) -> None:
+    # Worker side: map the parent's blocks, write rows start:stop, detach
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, (block, _) in spec.items()}
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype=np.float64, buffer=blocks[name].buf)
+            for name, (_, shape) in spec.items()
+        }
+        fn(arrays, start, stop, **kwargs)
+        del arrays
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+def _init_worker() -> None:
+    # Worker stage timings would never reach the parent's histograms
+    instrumentation.STAGE_TIMERS = False
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Workers are forked by a separate, single-threaded forkserver
+            # process, never by the threaded server (its children inherit
+            # locks other threads hold). The forkserver preloads the engine,
+            # but each worker still re-imports the server's main module, so
+            # that module must have no import-time side effects (see
+            # app.get_scenario_store). Jobs carry their baseline rows (see
+            # baseline_for_key)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            if context.get_start_method() == "forkserver":
+                context.set_forkserver_preload(PRELOAD)
+            _pool = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=context, initializer=_init_worker
+            )
+        return _pool
+
+
+@atexit.register
+def shutdown() -> None:
+    """Stop the pool now, cancelling queued chunks (exit, broken pool)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def map_chunks(
+    fn: ChunkFn,
+    arrays: SharedArrays,
+    start: int,
+    stop: int,
+    chunk_size: int,
+    **kwargs: Any,
+) -> Iterator[Tuple[int, int]]:
+    """
+    Call fn(arrays, chunk_start, chunk_stop, **kwargs) over start:stop in
+    chunks, yielding each (chunk_start, chunk_stop) in order once written.
+
+    Shared arrays are filled by the pool, all chunks in flight at once;
+    plain ones in-process. fn must be a module-level function (workers
+    import it) and kwargs picklable.
+    """
+    bounds = [(lo, min(lo + chunk_size, stop)) for lo in range(start, stop, chunk_size)]
+    if not arrays.shared:
+        for lo, hi in bounds:
+            fn(arrays.arrays, lo, hi, **kwargs)
+            yield lo, hi
+        return
+
+    pool = get_pool()
+    spec = arrays.spec
+    futures: List[Future] = [
+        pool.submit(_run_attached, fn, spec, lo, hi, kwargs) for lo, hi in bounds
+    ]
+    try:
+        for (lo, hi), future in zip(bounds, futures):
+            future.result()
+            yield lo, hi
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): start a fresh pool next time
+        shutdown()
+        raise
+    finally:
+        # Stop early on errors or an abandoned generator; the blocks are
+        # unlinked by the caller right after
+        for future in futures:
+            future.cancel()
+        for future in futures:
+            if not future.cancelled():
+                future.exception()
@@ -1,4 +1,262 @@
-from typing import Dict, Any, List
+import functools
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+# Color codes used by the compiled rules; COLORS[code] is the label
+RED, YELLOW, GREEN = 0, 1, 2
+COLORS = ("red", "yellow", "green")
+_COLOR_CODES = {name: code for code, name in enumerate(COLORS)}
+
+RULES_PATH = os.environ.get(
+    "REASONABILITY_RULES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "reasonability_rules.json"),
+)
+
+# Series lookups: name -> (N, T) array (array path) or list of floats
+# (single-row path), None when the series is missing
+Lookup = Callable[[str], Optional[np.ndarray]]
+RowLookup = Callable[[str], Optional[List[float]]]
+
+
+def _color(name: str) -> int:
+    if name not in _COLOR_CODES:
+        raise ValueError(f"Unknown color {name!r}, expected one of {COLORS}")
+    return _COLOR_CODES[name]
+
+
+def _bound(value: Optional[float], default: float) -> float:
+    return default if value is None else float(value)
+
+
+def _intervals(spec: List[List[Optional[float]]]) -> List[tuple]:
+    # Closed intervals [lo, hi]; null means unbounded on that side
+    return [(_bound(lo, -np.inf), _bound(hi, np.inf)) for lo, hi in spec]
+
+
+def _series_or_zeros(lookup: Lookup, key: str, shape: tuple) -> np.ndarray:
+    values = lookup(key)
+    return np.zeros(shape) if values is None else values
+
+
+def _bands(spec: Dict[str, Any]) -> List[tuple]:
+    # (first year, last year, green intervals, yellow intervals) per band
+    bands = []
+    for band in spec["bands"]:
+        first, last = band.get("years", [None, None])
+        bands.append(
+            (
+                _bound(first, -np.inf),
+                _bound(last, np.inf),
+                _intervals(band.get("green", [])),
+                _intervals(band.get("yellow", [])),
+            )
+        )
+    return bands
+
+
+def _filled(lows: List[float], highs: List[float]) -> List[tuple]:
+    return [(lo, hi) for lo, hi in zip(lows, highs) if lo <= hi]
+
+
+class CompiledRule:
+    """
+    One metric's rule, compiled once. Band rules become per-year bound
+    tables (cached per years tuple, first matching band per year, unused
+    slots empty) which both evaluation paths read: codes() compares (N, T)
+    arrays against them, row_codes() walks them in plain Python, as array
+    setup costs more than the work for a single scenario.
+    """
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.keys = (spec["value"], spec.get("fallback"))
+        self.per = spec.get("per")
+        self.bands: Optional[List[tuple]] = None
+        if "bands" in spec:
+            self.bands = _bands(spec)
+            self.bounds = functools.lru_cache(maxsize=32)(self._bounds)
+        elif "positive" in spec:
+            # Red when <= 0, otherwise the "positive" color unless the value
+            # dropped below yoy_drop.below × the previous (positive) year
+            self.positive = _color(spec["positive"])
+            drop = spec.get("yoy_drop")
+            self.drop = None if drop is None else (float(drop["below"]), _color(drop["color"]))
+        else:
+            raise ValueError(f"Rule for {name!r} needs either 'bands' or 'positive'")
+
+    def _bounds(self, years: tuple) -> tuple:
+        # (green lo, green hi, yellow lo, yellow hi) (slots, T) tables, and
+        # the same tables per year as (lo, hi) lists for row_codes(), minus
+        # the empty slots (which never match)
+        n_green = max((len(b[2]) for b in self.bands), default=0)
+        n_yellow = max((len(b[3]) for b in self.bands), default=0)
+        g_lo = np.full((n_green, len(years)), np.inf)
+        g_hi = np.full((n_green, len(years)), -np.inf)
+        y_lo = np.full((n_yellow, len(years)), np.inf)
+        y_hi = np.full((n_yellow, len(years)), -np.inf)
+        for t, year in enumerate(years):
+            for first, last, green, yellow in self.bands:
+                if first <= year <= last:
+                    for k, (lo, hi) in enumerate(green):
+                        g_lo[k, t], g_hi[k, t] = lo, hi
+                    for k, (lo, hi) in enumerate(yellow):
+                        y_lo[k, t], y_hi[k, t] = lo, hi
+                    break
+        per_year = [
+            (_filled(*green), _filled(*yellow))
+            for green, yellow in zip(
+                zip(g_lo.T.tolist(), g_hi.T.tolist()), zip(y_lo.T.tolist(), y_hi.T.tolist())
+            )
+        ]
+        return (g_lo, g_hi, y_lo, y_hi), per_year
+
+    def _values(self, lookup: Callable[[str], Any]) -> Any:
+        # Missing series count as zeros, like the original per-year loop
+        for key in self.keys:
+            values = lookup(key) if key is not None else None
+            if values is not None:
+                return values
+        return None
+
+    def codes(self, years: np.ndarray, lookup: Lookup, shape: tuple) -> np.ndarray:
+        """(N, T) int8 color codes of (N, T) series."""
+        values = self._values(lookup)
+        values = np.zeros(shape) if values is None else values
+
+        if self.bands is None:
+            red = values <= 0
+            codes = np.where(red, RED, self.positive).astype(np.int8)
+            if self.drop is not None and values.shape[1] > 1:
+                below, color = self.drop
+                prev = values[:, :-1]
+                cur = values[:, 1:]
+                codes[:, 1:][~red[:, 1:] & (prev > 0) & (cur < prev * below)] = color
+            return codes
+
+        valid = True
+        if self.per is not None:
+            den = _series_or_zeros(lookup, self.per, shape)
+            valid = den > 0
+            values = np.divide(values, den, out=np.zeros(shape), where=valid)
+
+        (g_lo, g_hi, y_lo, y_hi), _ = self.bounds(tuple(years.tolist()))
+        v = values[:, None, :]
+        green = valid & ((v >= g_lo) & (v <= g_hi)).any(axis=1)
+        yellow = valid & ((v >= y_lo) & (v <= y_hi)).any(axis=1)
+        return np.where(green, GREEN, np.where(yellow, YELLOW, RED)).astype(np.int8)
+
+    def row_codes(self, years: tuple, lookup: RowLookup) -> List[int]:
+        """codes() of a single scenario given as float lists."""
+        values: List[Optional[float]] = self._values(lookup) or [0.0] * len(years)
+
+        if self.bands is None:
+            codes = []
+            prev = None
+            for v in values:
+                code = RED if v <= 0 else self.positive
+                if code != RED and self.drop is not None and prev is not None and prev > 0:
+                    if v < prev * self.drop[0]:
+                        code = self.drop[1]
+                codes.append(code)
+                prev = v
+            return codes
+
+        if self.per is not None:
+            # Years without a positive denominator are red (None)
+            dens = lookup(self.per) or [0.0] * len(years)
+            values = [v / d if d > 0 else None for v, d in zip(values, dens)]
+
+        _, per_year = self.bounds(years)
+        codes = []
+        for v, (green, yellow) in zip(values, per_year):
+            code = RED
+            if v is not None:
+                for lo, hi in green:
+                    if lo <= v <= hi:
+                        code = GREEN
+                        break
+                else:
+                    for lo, hi in yellow:
+                        if lo <= v <= hi:
+                            code = YELLOW
+                            break
+            codes.append(code)
+        return codes
+
+
+class RuleSet:
+    """Reasonability rules, one CompiledRule per metric."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.version = spec.get("version")
+        # Changes with any edit of the rules, bumped version or not
+        self.fingerprint = hashlib.sha256(
+            json.dumps(spec, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self.metrics: Dict[str, CompiledRule] = {
+            name: CompiledRule(name, metric) for name, metric in spec["metrics"].items()
+        }
+        # Series the rules read from the engine results
+        self.fields = sorted(
+            {
+                key
+                for metric in spec["metrics"].values()
+                for key in (metric["value"], metric.get("fallback"), metric.get("per"))
+                if key
+            }
+        )
+
+    def evaluate(self, years: np.ndarray, series: Dict[str, np.ndarray], rows: int) -> Dict[str, np.ndarray]:
+        shape = (rows, len(years))
+        return {name: rule.codes(years, series.get, shape) for name, rule in self.metrics.items()}
+
+    def evaluate_row(self, years: tuple, series: Dict[str, List[float]]) -> Dict[str, List[str]]:
+        return {
+            name: [COLORS[code] for code in rule.row_codes(years, series.get)]
+            for name, rule in self.metrics.items()
+        }
+
+
+_lock = threading.Lock()
+_rules: Optional[RuleSet] = None
+
+
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    """(Re)load the rule table from JSON and make it the active rule set."""
+    global _rules
+    with open(path or RULES_PATH, "r") as f:
+        rules = RuleSet(json.load(f))
+    with _lock:
+        _rules = rules
+    return rules
+
+
+def get_rules() -> RuleSet:
+    with _lock:
+        rules = _rules
+    return rules if rules is not None else load_rules()
+
+
+def decode_colors(codes: np.ndarray) -> List[Any]:
+    """Color codes (any shape) -> nested lists of "green" / "yellow" / "red"."""
+    return np.asarray(COLORS)[codes].tolist()
+
+
+def evaluate_reasonability_batch(batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Score N results at once (compute_financials_batch layout: "years" plus
+    (N, T) series). Returns metric -> (N, T) int8 color codes.
+    """
+    rules = get_rules()
+    years = np.asarray(batch["years"])
+    series = {key: np.asarray(batch[key], dtype=float) for key in rules.fields if key in batch}
+    rows = next(iter(series.values())).shape[0] if series else 0
+    return rules.evaluate(years, series, rows)
 
 
 def evaluate_reasonability(results: Dict[str, Any]) -> Dict[str, List[str]]:
@@ -9,119 +267,21 @@ def evaluate_reasonability(results: Dict[str, Any]) -> Dict[str, List[str]]:
       - ROAS
       - Revenues (stabilità / crescita)
       - Staff (MAU per FTE)
-    """
 
-    years: List[int] = results.get("years", [])
+    Le soglie sono in reasonability_rules.json (vedi load_rules).
+    """
+    rules = get_rules()
+    years = tuple(float(year) for year in results.get("years", []))
     n = len(years)
 
-    mau: List[float] = results.get("mau", [0.0] * n)
-    revenues: List[float] = results.get("revenues", [0.0] * n)
-    roas: List[float] = results.get("roas", [0.0] * n)
-
-    # Preferisce CAC per paying customers se disponibile
-    cac_paying: List[float] = results.get(
-        "cac_paying",
-        results.get("cac", [0.0] * n),
-    )
-
-    staff: List[float] = results.get("staff", [0.0] * n)
-
-    colors_mau: List[str] = []
-    colors_cac: List[str] = []
-    colors_roas: List[str] = []
-    colors_revenues: List[str] = []
-    colors_staff: List[str] = []
-
-    for i in range(n):
-        y = years[i] if i < len(years) else i + 1
-        m = float(mau[i]) if i < len(mau) else 0.0
-        r = float(roas[i]) if i < len(roas) else 0.0
-        rev = float(revenues[i]) if i < len(revenues) else 0.0
-        cac_val = float(cac_paying[i]) if i < len(cac_paying) else 0.0
-        st = float(staff[i]) if i < len(staff) else 0.0
-
-        # --- MAU (industry-like adoption curves) ---
-        if y <= 3:
-            # Early: 50k–500k green
-            if 50_000 <= m <= 500_000:
-                cm = "green"
-            elif 10_000 <= m < 50_000 or 500_000 < m <= 1_000_000:
-                cm = "yellow"
-            else:
-                cm = "red"
-        elif 4 <= y <= 6:
-            # Mid: 300k–2M green
-            if 300_000 <= m <= 2_000_000:
-                cm = "green"
-            elif 200_000 <= m < 300_000 or 2_000_000 < m <= 4_000_000:
-                cm = "yellow"
-            else:
-                cm = "red"
-        else:
-            # Mature: 1–3M green
-            if 1_000_000 <= m <= 3_000_000:
-                cm = "green"
-            elif 600_000 <= m < 1_000_000 or 3_000_000 < m <= 5_000_000:
-                cm = "yellow"
-            else:
-                cm = "red"
-        colors_mau.append(cm)
-
-        # --- CAC per paying customer (€/user) ---
-        # Green: 5–25 ; Yellow: 25–50 ; Red: otherwise
-        if cac_val <= 0:
-            cc = "red"
-        elif 5 <= cac_val <= 25:
-            cc = "green"
-        elif 25 < cac_val <= 50:
-            cc = "yellow"
-        else:
-            cc = "red"
-        colors_cac.append(cc)
-
-        # --- ROAS ---
-        # Green: ≥1.5 ; Yellow: 1.0–1.5 ; Red: <1.0
-        if r >= 1.5:
-            cr = "green"
-        elif 1.0 <= r < 1.5:
-            cr = "yellow"
-        else:
-            cr = "red"
-        colors_roas.append(cr)
+    # Missing or short series are padded with zeros, as in the batch path
+    series: Dict[str, List[float]] = {}
+    for key in rules.fields:
+        if key in results:
+            data = results[key]
+            if not (isinstance(data, list) and len(data) == n):
+                data = [float(v) for v in list(data)[:n]]
+                data += [0.0] * (n - len(data))
+            series[key] = data
 
-        # --- Revenues ---
-        # Red se <=0, Yellow se calano >20% anno su anno, Green altrimenti
-        if rev <= 0:
-            crv = "red"
-        else:
-            if i > 0:
-                prev_rev = float(revenues[i - 1])
-                if prev_rev > 0 and rev < prev_rev * 0.8:
-                    crv = "yellow"
-                else:
-                    crv = "green"
-            else:
-                crv = "green"
-        colors_revenues.append(crv)
-
-        # --- Staff: MAU per FTE ---
-        # Green: 20k–50k users per FTE ; Yellow: 10k–20k o 50k–80k ; Red: resto
-        if st <= 0:
-            cs = "red"
-        else:
-            ratio = m / st
-            if 20_000 <= ratio <= 50_000:
-                cs = "green"
-            elif 10_000 <= ratio < 20_000 or 50_000 < ratio <= 80_000:
-                cs = "yellow"
-            else:
-                cs = "red"
-        colors_staff.append(cs)
-
-    return {
-        "mau": colors_mau,
-        "cac": colors_cac,
-        "roas": colors_roas,
-        "revenues": colors_revenues,
-        "staff": colors_staff,
-    }
+    return rules.evaluate_row(years, series)
@@ -0,0 +1,85 @@
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from financial_engine import (
+    baseline_key,
+    batch_payload,
+    compute_financials_batch,
+    get_baseline,
+    results_version,
+)
+from metrics import evaluate_metric, to_json_value
+from reasonability import COLORS, decode_colors, evaluate_reasonability_batch, get_rules
+from scenario_store import Materialized
+
+
+def stored_version() -> str:
+    """
+    Version of stored results: results_version() plus the fingerprint of
+    the reasonability rules their colors and worst_color come from.
+    """
+    return f"{results_version()}+rules.{get_rules().fingerprint}"
+
+
+def materialize(
+    params: Sequence[Dict[str, Any]], skip_invalid: bool = False
+) -> List[Optional[Materialized]]:
+    """
+    Results and summary rows for saved scenarios, computed in one batched
+    engine pass per distinct baseline_key. results has the /run_model payload
+    shape; worst_color is the lowest reasonability color code over every
+    metric and year.
+
+    Scenarios with invalid parameters raise ValueError, or get None with
+    skip_invalid (so one bad stored scenario does not block the others).
+    """
+    groups: Dict[Any, List[int]] = {}
+    for i, p in enumerate(params):
+        try:
+            if not isinstance(p, dict):
+                raise ValueError("Scenario data must be a JSON object")
+            key = baseline_key(p)
+        except ValueError:
+            if not skip_invalid:
+                raise
+            continue
+        groups.setdefault(key, []).append(i)
+
+    out: List[Any] = [None] * len(params)
+    for indices in groups.values():
+        group = [params[i] for i in indices]
+        for i, materialized in zip(indices, _materialize(group)):
+            out[i] = materialized
+    return out
+
+
+def _materialize(params: List[Dict[str, Any]]) -> List[Materialized]:
+    # Taken first: a rules reload during the run then only leaves it stale
+    version = stored_version()
+    batch = compute_financials_batch(params, get_baseline(params[0]))
+    codes = evaluate_reasonability_batch(batch)
+    worst = np.min([c.min(axis=1) for c in codes.values()], axis=0) if codes else None
+
+    summary = {
+        "total_profit": evaluate_metric(batch, "total_profit"),
+        "first_profitable_year": evaluate_metric(batch, "first_profitable_year"),
+        "peak_cumulative_loss": evaluate_metric(batch, "peak_cumulative_loss"),
+        "final_revenue": evaluate_metric(batch, "revenue"),
+    }
+
+    out = []
+    for i in range(len(params)):
+        row = {name: to_json_value(values[i]) for name, values in summary.items()}
+        row["worst_color"] = None if worst is None else int(worst[i])
+        results = {
+            "results": batch_payload(batch, i),
+            "reasonability": {name: decode_colors(c[i]) for name, c in codes.items()},
+        }
+        out.append(Materialized(version, results, row))
+    return out
+
+
+def color_label(code: Any) -> Any:
+    """worst_color code -> "red" / "yellow" / "green" (None stays None)."""
+    return None if code is None else COLORS[code]
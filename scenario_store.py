@@ -0,0 +1,330 @@
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Summary columns materialized next to each scenario's results
+SUMMARY_FIELDS = (
+    "total_profit",
+    "first_profitable_year",
+    "peak_cumulative_loss",
+    "final_revenue",
+    "worst_color",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name       TEXT PRIMARY KEY,
+    data       TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenarios_updated_at ON scenarios (updated_at);
+
+CREATE TABLE IF NOT EXISTS scenario_tags (
+    name TEXT NOT NULL REFERENCES scenarios (name) ON DELETE CASCADE,
+    tag  TEXT NOT NULL,
+    PRIMARY KEY (name, tag)
+);
+CREATE INDEX IF NOT EXISTS scenario_tags_tag ON scenario_tags (tag);
+
+CREATE TABLE IF NOT EXISTS scenario_results (
+    name                  TEXT PRIMARY KEY REFERENCES scenarios (name) ON DELETE CASCADE,
+    engine_version        TEXT NOT NULL,
+    results               TEXT NOT NULL,
+    total_profit          REAL,
+    first_profitable_year REAL,
+    peak_cumulative_loss  REAL,
+    final_revenue         REAL,
+    worst_color           INTEGER
+);
+CREATE INDEX IF NOT EXISTS scenario_results_version ON scenario_results (engine_version);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS scenario_results_{field} ON scenario_results ({field});\n"
+    for field in SUMMARY_FIELDS
+)
+
+# SQLite's default limit on bound parameters is 999
+_MAX_VARIABLES = 900
+
+
+class Materialized(NamedTuple):
+    """Computed results of a scenario and their summary row (SUMMARY_FIELDS)."""
+
+    engine_version: str
+    results: Dict[str, Any]
+    summary: Dict[str, Any]
+
+
+class ScenarioStore:
+    """
+    Saved scenarios in an embedded SQLite database.
+
+    Each scenario is its JSON body plus tags and created / updated
+    timestamps; every write runs in a single transaction, so a reader sees
+    either the old or the new scenario, never a partial one. Connections
+    are per thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _tags(self, conn: sqlite3.Connection, names: List[str]) -> Dict[str, List[str]]:
+        tags: Dict[str, List[str]] = {name: [] for name in names}
+        for chunk in _chunks(names):
+            rows = conn.execute(
+                f"SELECT name, tag FROM scenario_tags WHERE name IN ({_marks(chunk)}) ORDER BY tag",
+                chunk,
+            )
+            for row in rows:
+                tags[row["name"]].append(row["tag"])
+        return tags
+
+    def save(
+        self,
+        name: str,
+        data: Dict[str, Any],
+        tags: Optional[Iterable[str]] = None,
+        timestamp: Optional[float] = None,
+        materialized: Optional[Materialized] = None,
+    ) -> Dict[str, Any]:
+        """
+        Insert or replace a scenario; created_at survives updates. Results
+        stored for the previous version are dropped unless `materialized`
+        replaces them in the same transaction.
+        """
+        now = time.time() if timestamp is None else timestamp
+        tags = sorted(set(tags or []))
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO scenarios (name, data, created_at, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+                """,
+                (name, json.dumps(data), now, now),
+            )
+            conn.execute("DELETE FROM scenario_tags WHERE name = ?", (name,))
+            conn.executemany(
+                "INSERT INTO scenario_tags (name, tag) VALUES (?, ?)", [(name, tag) for tag in tags]
+            )
+            conn.execute("DELETE FROM scenario_results WHERE name = ?", (name,))
+            if materialized is not None:
+                _insert_results(conn, [(name, materialized)])
+            row = conn.execute(
+                "SELECT created_at, updated_at FROM scenarios WHERE name = ?", (name,)
+            ).fetchone()
+        return {"name": name, "tags": tags, "created_at": row["created_at"], "updated_at": row["updated_at"]}
+
+    def names(self) -> List[str]:
+        """Every scenario name, sorted."""
+        return [row[0] for row in self._conn().execute("SELECT name FROM scenarios ORDER BY name")]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([name]).get(name)
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Scenarios by name (missing names are left out), in one query per 900 names."""
+        names = list(dict.fromkeys(names))
+        conn = self._conn()
+        found: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(names):
+            rows = conn.execute(
+                f"SELECT * FROM scenarios WHERE name IN ({_marks(chunk)})", chunk
+            )
+            for row in rows:
+                found[row["name"]] = {
+                    "name": row["name"],
+                    "data": json.loads(row["data"]),
+                    "created_at": row["created_at"],
+                    "updated_at": row["updated_at"],
+                }
+        tags = self._tags(conn, list(found))
+        for name, record in found.items():
+            record["tags"] = tags[name]
+        return {name: found[name] for name in names if name in found}
+
+    def list(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        tag: Optional[str] = None,
+        prefix: Optional[str] = None,
+        engine_version: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of scenario metadata plus the total match count.
+
+        With `engine_version`, items carry the summary row materialized for
+        that version (None when missing or stale), and `sort` / `ranges`
+        (field -> (min, max), inclusive, None = open) may use SUMMARY_FIELDS.
+        """
+        summary_fields = SUMMARY_FIELDS if engine_version is not None else ()
+        if sort not in ("name", "created_at", "updated_at") + summary_fields:
+            raise ValueError(f"Cannot sort by {sort!r}")
+        unknown = set(ranges or {}) - set(summary_fields)
+        if unknown:
+            raise ValueError(f"Cannot filter by {sorted(unknown)}")
+
+        where, args = [], []
+        if tag is not None:
+            where.append("s.name IN (SELECT name FROM scenario_tags WHERE tag = ?)")
+            args.append(tag)
+        if prefix:
+            # Range scan on the primary key index instead of LIKE
+            where.append("s.name >= ? AND s.name < ?")
+            args.extend([prefix, prefix + "\U0010ffff"])
+        for field, (low, high) in (ranges or {}).items():
+            if low is not None:
+                where.append(f"r.{field} >= ?")
+                args.append(low)
+            if high is not None:
+                where.append(f"r.{field} <= ?")
+                args.append(high)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        join = "LEFT JOIN scenario_results r ON r.name = s.name AND r.engine_version = ?"
+        join_args = [engine_version]
+        columns = "".join(f", r.{field}" for field in summary_fields)
+        order = f"{'s' if sort in ('name', 'created_at', 'updated_at') else 'r'}.{sort}"
+        direction = "DESC" if descending else "ASC"
+
+        conn = self._conn()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM scenarios s {join} {clause}", join_args + args
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"""
+            SELECT s.name, s.created_at, s.updated_at, r.name AS materialized{columns}
+            FROM scenarios s {join} {clause}
+            ORDER BY {order} {direction}, s.name LIMIT ? OFFSET ?
+            """,
+            join_args + args + [limit, offset],
+        ).fetchall()
+        tags = self._tags(conn, [row["name"] for row in rows])
+        items = []
+        for row in rows:
+            item = {
+                "name": row["name"],
+                "tags": tags[row["name"]],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+            }
+            if engine_version is not None:
+                item["summary"] = (
+                    {field: row[field] for field in summary_fields}
+                    if row["materialized"] is not None
+                    else None
+                )
+            items.append(item)
+        return items, total
+
+    def get_results(self, name: str, engine_version: str) -> Optional[Dict[str, Any]]:
+        """Materialized results of `name` if computed by `engine_version`."""
+        row = self._conn().execute(
+            "SELECT results FROM scenario_results WHERE name = ? AND engine_version = ?",
+            (name, engine_version),
+        ).fetchone()
+        return None if row is None else json.loads(row["results"])
+
+    def save_results(self, items: Iterable[Tuple[str, Materialized]]) -> None:
+        """Store (name, Materialized) pairs in one transaction."""
+        conn = self._conn()
+        with conn:
+            _insert_results(conn, list(items))
+
+    def stale(self, engine_version: str) -> List[str]:
+        """Names of scenarios without results materialized by `engine_version`."""
+        rows = self._conn().execute(
+            """
+            SELECT s.name FROM scenarios s
+            LEFT JOIN scenario_results r ON r.name = s.name AND r.engine_version = ?
+            WHERE r.name IS NULL ORDER BY s.name
+            """,
+            (engine_version,),
+        )
+        return [row["name"] for row in rows]
+
+    def delete(self, name: str) -> bool:
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def import_json_dir(
+        self, directory: str, validate: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> int:
+        """
+        Import the legacy one-file-per-scenario JSON directory. Scenarios
+        already in the store are kept; file mtimes become the timestamps.
+        Files that are not a JSON object, or whose data `validate` rejects
+        with a ValueError, are skipped with a warning. Returns the number
+        of scenarios imported.
+        """
+        existing = set(self.names())
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            name = os.path.basename(path)[: -len(".json")]
+            if name in existing:
+                continue
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                if validate is not None:
+                    validate(data)
+            except (OSError, ValueError) as exc:
+                log.warning("Skipping legacy scenario %s: %s", path, exc)
+                continue
+            tags = data.get("tags")
+            if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+                tags = None
+            self.save(name, data, tags=tags, timestamp=os.path.getmtime(path))
+            imported += 1
+        return imported
+
+
+def _insert_results(conn: sqlite3.Connection, items: List[Tuple[str, Materialized]]) -> None:
+    columns = ", ".join(SUMMARY_FIELDS)
+    marks = ", ".join("?" * (len(SUMMARY_FIELDS) + 3))
+    conn.executemany(
+        f"INSERT OR REPLACE INTO scenario_results (name, engine_version, results, {columns}) VALUES ({marks})",
+        [
+            (name, m.engine_version, json.dumps(m.results))
+            + tuple(m.summary.get(field) for field in SUMMARY_FIELDS)
+            for name, m in items
+        ],
+    )
+
+
+def _marks(values: List[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(values), _MAX_VARIABLES):
+        yield values[start:start + _MAX_VARIABLES]
@@ -0,0 +1,92 @@
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from financial_engine import SCALE_KEYS, compute_financials_batch, get_baseline, scales_matrix
+from metrics import evaluate_metric, to_json_value
+
+DEFAULT_OUTPUTS = ["total_profit", "revenue", "first_profitable_year"]
+
+
+def run_sensitivity(
+    base: Optional[Dict[str, Any]] = None,
+    params: Sequence[str] = SCALE_KEYS,
+    steps: Sequence[float] = (0.1,),
+    outputs: Sequence[str] = DEFAULT_OUTPUTS,
+    year: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Tornado analysis around a base scenario.
+
+    Each parameter is moved down and up by every relative step
+    (scale × (1 - step) and scale × (1 + step)); the base scenario and all
+    2 × len(params) × len(steps) perturbations are evaluated in a single
+    compute_financials_batch call. Bars are sorted by their largest swing.
+    """
+    if base is not None and not isinstance(base, dict):
+        raise ValueError("base must be an object of scenario parameters")
+    unknown = set(params) - set(SCALE_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown params: {sorted(unknown)}")
+    steps = [float(s) for s in steps]
+    if not steps or any(not 0 < s < 1 for s in steps):
+        raise ValueError("steps must be relative changes in (0, 1)")
+
+    base_row = scales_matrix([base or {}])[0]
+
+    # Row 0 = base, then (low, high) pairs per (param, step)
+    rows = [base_row]
+    cases = []
+    for param in params:
+        j = SCALE_KEYS.index(param)
+        for step in steps:
+            low = base_row.copy()
+            high = base_row.copy()
+            low[j] *= 1.0 - step
+            high[j] *= 1.0 + step
+            rows.extend([low, high])
+            cases.append((param, step, low[j], high[j]))
+
+    batch = compute_financials_batch(np.array(rows), get_baseline(base))
+
+    results: Dict[str, Any] = {}
+    for output in outputs:
+        values = evaluate_metric(batch, output, year)
+        base_value = values[0]
+        lows = values[1::2]
+        highs = values[2::2]
+        swings = np.abs(highs - lows)
+
+        bars: Dict[str, Dict[str, Any]] = {}
+        max_swing: Dict[str, float] = {}
+        for k, (param, step, low_scale, high_scale) in enumerate(cases):
+            bar = bars.setdefault(param, {"param": param, "steps": []})
+            bar["steps"].append(
+                {
+                    "step": step,
+                    "low_scale": float(low_scale),
+                    "high_scale": float(high_scale),
+                    "low": to_json_value(lows[k]),
+                    "high": to_json_value(highs[k]),
+                    "low_delta": to_json_value(lows[k] - base_value),
+                    "high_delta": to_json_value(highs[k] - base_value),
+                    "swing": to_json_value(swings[k]),
+                }
+            )
+            max_swing[param] = np.fmax(max_swing.get(param, np.nan), swings[k])
+
+        for param, bar in bars.items():
+            bar["max_swing"] = to_json_value(max_swing[param])
+
+        # Largest bars first; parameters with undefined swings go last
+        ordered = sorted(
+            bars.values(),
+            key=lambda b: (b["max_swing"] is None, -(b["max_swing"] or 0.0)),
+        )
+        results[output] = {"base": to_json_value(base_value), "bars": ordered}
+
+    return {
+        "base": dict(zip(SCALE_KEYS, base_row.tolist())),
+        "year": year,
+        "outputs": results,
+    }
@@ -60,11 +60,9 @@ async function runModel() {
     const payload = getInputs();
 
     try {
-        const response = await fetch("/run_model", {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify(payload)
-        });
+        // GET, so the browser can reuse cached responses (ETag / max-age)
+        const query = new URLSearchParams(payload);
+        const response = await fetch("/run_model?" + query.toString());
 
         if (!response.ok) throw new Error("API error " + response.status);
 
@@ -658,5 +656,152 @@ async function loadScenario() {
     alert("Scenario loaded: " + name);
 }
 
+//--------------------------------------------------------------
+// 7. Live mode: sessione sul server, invia solo i delta degli slider
+//    e riceve via SSE solo le serie cambiate
+//--------------------------------------------------------------
+const LIVE_SLIDERS = [
+  "mau_scale",
+  "conv_game_scale",
+  "conv_course_scale",
+  "marketing_scale",
+  "event_yield_scale",
+  "content_cost_scale",
+  "staff_scale",
+  "srv_hw_scale"
+];
+
+let live = null;  // { id, source, results, params, frame }
+
+function liveParams() {
+    const params = {};
+    LIVE_SLIDERS.forEach(id => {
+        params[id] = parseFloat(document.getElementById(id).value);
+    });
+    return params;
+}
+
+function applyLiveUpdate(update) {
+    Object.assign(live.results, update.series);
+    live.results.years = update.years;
+    live.results.cac = live.results.cac_paying;
+    live.params = update.params;
+
+    // Un solo redraw per frame anche se arrivano più update
+    if (live.frame) return;
+    live.frame = requestAnimationFrame(() => {
+        live.frame = null;
+        renderResultsCharts(live.results);
+        renderInputCharts(getInputs(), live.results);
+    });
+}
+
+async function sendLiveDelta(event) {
+    if (!live) return;
+    const delta = { [event.target.id]: parseFloat(event.target.value) };
+    await fetch(`/live/sessions/${live.id}/params`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(delta)
+    });
+}
+
+async function startLiveSession() {
+    const response = await fetch("/live/sessions", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(liveParams())
+    });
+    if (!response.ok) {
+        alert("Live mode error " + response.status);
+        return;
+    }
+
+    const data = await response.json();
+    live = { id: data.session_id, source: null, results: {}, params: {}, frame: null };
+    applyLiveUpdate(data);
+
+    live.source = new EventSource(`/live/sessions/${live.id}/events`);
+    live.source.addEventListener("update", e => applyLiveUpdate(JSON.parse(e.data)));
+    LIVE_SLIDERS.forEach(id => document.getElementById(id).addEventListener("input", sendLiveDelta));
+    console.log("🔴 Live session started:", live.id);
+}
+
+async function stopLiveSession() {
+    if (!live) return;
+    const session = live;
+    live = null;
+    session.source.close();
+    LIVE_SLIDERS.forEach(id => document.getElementById(id).removeEventListener("input", sendLiveDelta));
+    await fetch(`/live/sessions/${session.id}`, { method: "DELETE" });
+    console.log("⏹ Live session closed:", session.id);
+}
+
+async function toggleLiveSession() {
+    if (live) await stopLiveSession();
+    else await startLiveSession();
+    document.getElementById("live_toggle").innerText = "Live mode: " + (live ? "on" : "off");
+}
+
+//--------------------------------------------------------------
+// 8. Anteprima istantanea: il modello gira nel browser durante il drag
+//    (local_model.js + /model_spec); al rilascio il server conferma.
+//    La parità locale / server è verificata da
+//    tests/test_local_model_parity.py
+//--------------------------------------------------------------
+let preview = null;  // { spec, frame }
+
+function renderPreview() {
+    if (!preview || preview.frame) return;
+    preview.frame = requestAnimationFrame(() => {
+        preview.frame = null;
+        const results = evaluateModel(preview.spec, liveParams());
+        renderResultsCharts(results);
+        renderInputCharts(getInputs(), results);
+    });
+}
+
+async function confirmPreview() {
+    if (!preview) return;
+    const params = liveParams();
+    const response = await fetch("/run_model?" + new URLSearchParams(params).toString());
+    if (!response.ok) return;
+    const server = await response.json();
+
+    renderResultsCharts(server.results);
+    renderInputCharts(getInputs(), server.results);
+}
+
+async function startPreview() {
+    const response = await fetch("/model_spec");
+    if (!response.ok) {
+        alert("Model spec error " + response.status);
+        return;
+    }
+    preview = { spec: await response.json(), frame: null };
+    LIVE_SLIDERS.forEach(id => {
+        const slider = document.getElementById(id);
+        slider.addEventListener("input", renderPreview);
+        slider.addEventListener("change", confirmPreview);
+    });
+    renderPreview();
+    console.log("⚡ Instant preview on, engine", preview.spec.engine_version);
+}
+
+function stopPreview() {
+    LIVE_SLIDERS.forEach(id => {
+        const slider = document.getElementById(id);
+        slider.removeEventListener("input", renderPreview);
+        slider.removeEventListener("change", confirmPreview);
+    });
+    preview = null;
+}
+
+async function togglePreview() {
+    if (preview) stopPreview();
+    else await startPreview();
+    document.getElementById("preview_toggle").innerText = "Instant preview: " + (preview ? "on" : "off");
+}
+
 //--------------------------------------------------------------
 console.log("SpArks app.js fully initialized 🛸");
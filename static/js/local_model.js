@@ -0,0 +1,167 @@
+// local_model.js — valuta il modello nel browser a partire da /model_spec
+//
+// Repeats the operations of financial_engine.compute_financials in the same
+// order on the exported coefficients, so results match the server to the
+// last bit (doubles on both sides). No DOM access: app.js wires it to the
+// sliders.
+
+const SUPPORTED_SPEC_FORMAT = 1;
+
+function normalizedScales(spec, params) {
+    // Same as financial_engine._get_scale: missing / invalid -> 1, negatives -> 0
+    return spec.scale_keys.map(key => {
+        let v = Number(params[key] ?? 1.0);
+        if (Number.isNaN(v)) v = 1.0;
+        return Math.max(v, 0.0);
+    });
+}
+
+function evaluateModel(spec, params) {
+    if (spec.format !== SUPPORTED_SPEC_FORMAT) {
+        throw new Error("Unsupported model spec format " + spec.format);
+    }
+    const [
+        mauScale, convGameScale, convCourseScale, marketingScale,
+        eventYieldScale, contentCostScale, staffScale, srvHwScale
+    ] = normalizedScales(spec, params);
+    const c = spec.coefficients;
+    const spaceMinProfit = spec.constants.space_min_profit;
+
+    const gameDriver = mauScale * convGameScale;
+    const formationDriver = mauScale * convCourseScale;
+    const hwDriver = staffScale * srvHwScale;
+
+    const out = {
+        years: spec.years.slice(), mau: [], revenues: [], costs: [], profit: [], staff: [],
+        roas: [], cac_total: [], cac_paying: [], game_revenue: [], formation_revenue: [],
+        xr_revenue: [], marketing_total: [], space_cost_used: [], profit_before_space: []
+    };
+
+    for (let t = 0; t < spec.years.length; t++) {
+        const mau = c.mau[t] * mauScale;
+        const marketingTotal = c.coeff_marketing[t] * marketingScale;
+        const salaries = c.salaries[t] * staffScale;
+        const servicesHw = c.cost_hw[t] * hwDriver;
+        const formationCost = c.cost_formation[t] * contentCostScale;
+
+        const gameRev = c.coeff_game_rev[t] * gameDriver;
+        const formationRev = c.coeff_formation_rev[t] * formationDriver;
+        const xrRev = c.rev_xr[t] * eventYieldScale;
+        const revenues = gameRev + formationRev + xrRev;
+
+        const partialCosts = marketingTotal + salaries + servicesHw + formationCost + c.coeff_fixed_costs[t];
+        const profitBefore = revenues - partialCosts;
+        const spaceUsed = profitBefore <= spaceMinProfit
+            ? 0.0
+            : Math.min(c.planned_space[t], profitBefore - spaceMinProfit);
+        const totalCost = partialCosts + spaceUsed;
+        const profit = revenues - totalCost;
+
+        const newUsers = c.coeff_new_users[t] * mauScale;
+        let payingRatio = c.conv_game[t] * convGameScale + c.conv_premium[t] + c.coeff_conv_course[t] * convCourseScale;
+        payingRatio = Math.min(Math.max(payingRatio, 0.0), 1.0);
+        const newPaying = newUsers * payingRatio;
+
+        out.mau.push(mau);
+        out.revenues.push(revenues);
+        out.costs.push(totalCost);
+        out.profit.push(profit);
+        out.staff.push(c.staff_count[t] * staffScale);
+        out.roas.push(marketingTotal > 0 ? revenues / marketingTotal : 0.0);
+        out.cac_total.push(newUsers > 0 ? marketingTotal / newUsers : 0.0);
+        out.cac_paying.push(newPaying > 0 ? marketingTotal / newPaying : 0.0);
+        out.game_revenue.push(gameRev);
+        out.formation_revenue.push(formationRev);
+        out.xr_revenue.push(xrRev);
+        out.marketing_total.push(marketingTotal);
+        out.space_cost_used.push(spaceUsed);
+        out.profit_before_space.push(profitBefore);
+    }
+    out.cac = out.cac_paying;
+    return out;
+}
+
+//--------------------------------------------------------------
+// Reasonability: stesse regole di reasonability.py (bands / positive)
+//--------------------------------------------------------------
+function ruleValues(rule, results, n) {
+    for (const key of [rule.value, rule.fallback]) {
+        if (key != null && results[key] != null) return results[key];
+    }
+    return new Array(n).fill(0.0);
+}
+
+function inIntervals(v, intervals) {
+    return (intervals || []).some(([lo, hi]) =>
+        v >= (lo ?? -Infinity) && v <= (hi ?? Infinity));
+}
+
+function evaluateRule(rule, years, results) {
+    const n = years.length;
+    const values = ruleValues(rule, results, n);
+
+    if (rule.bands) {
+        const den = rule.per ? (results[rule.per] ?? new Array(n).fill(0.0)) : null;
+        return years.map((year, t) => {
+            let v = values[t];
+            if (den) {
+                if (!(den[t] > 0)) return "red";
+                v = v / den[t];
+            }
+            const band = rule.bands.find(b => {
+                const [first, last] = b.years || [null, null];
+                return year >= (first ?? -Infinity) && year <= (last ?? Infinity);
+            });
+            if (!band) return "red";
+            if (inIntervals(v, band.green)) return "green";
+            if (inIntervals(v, band.yellow)) return "yellow";
+            return "red";
+        });
+    }
+
+    if (rule.positive) {
+        const drop = rule.yoy_drop;
+        return values.map((v, t) => {
+            if (v <= 0) return "red";
+            if (drop && t > 0 && values[t - 1] > 0 && v < values[t - 1] * drop.below) {
+                return drop.color;
+            }
+            return rule.positive;
+        });
+    }
+    throw new Error("Rule needs either 'bands' or 'positive'");
+}
+
+function evaluateReasonabilityLocal(spec, results) {
+    const colors = {};
+    for (const [name, rule] of Object.entries(spec.reasonability.metrics)) {
+        colors[name] = evaluateRule(rule, results.years, results);
+    }
+    return colors;
+}
+
+//--------------------------------------------------------------
+// Parity: confronto con la risposta del server (tests/local_model_parity.js)
+//--------------------------------------------------------------
+function compareWithServer(local, localColors, server) {
+    // Returns a list of mismatch descriptions (empty when identical)
+    const mismatches = [];
+    for (const [key, values] of Object.entries(local)) {
+        const remote = server.results[key];
+        if (!Array.isArray(remote)) continue;
+        values.forEach((v, t) => {
+            if (v !== remote[t]) mismatches.push(`${key}[${t}]: local ${v}, server ${remote[t]}`);
+        });
+    }
+    for (const [name, colors] of Object.entries(localColors)) {
+        const remote = server.reasonability[name] || [];
+        colors.forEach((color, t) => {
+            if (color !== remote[t]) mismatches.push(`${name} color[${t}]: local ${color}, server ${remote[t]}`);
+        });
+    }
+    return mismatches;
+}
+
+if (typeof module !== "undefined") {
+    module.exports = { evaluateModel, evaluateReasonabilityLocal, compareWithServer };
+}
@@ -0,0 +1,140 @@
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from encoding import ResponseFormat, encode_array
+from financial_engine import (
+    SCALE_KEYS,
+    BaselineKey,
+    baseline_for_key,
+    baseline_key,
+    compute_financials_batch,
+    scales_matrix,
+    source_rows,
+)
+from metrics import evaluate_metric
+from parallel import WORKERS, SharedArrays, map_chunks, use_pool
+
+DEFAULT_OUTPUTS = ["total_profit", "breakeven_year", "min_annual_profit"]
+
+
+def sweep_axes(axes: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate sweep axes and expand them into grid values.
+
+    Each axis is {"param": <scale key>, "min": float, "max": float,
+    "steps": int}; at least two distinct parameters are required.
+    """
+    if len(axes) < 2:
+        raise ValueError("a sweep needs at least two axes")
+
+    expanded = []
+    for axis in axes:
+        param = axis.get("param")
+        if param not in SCALE_KEYS:
+            raise ValueError(f"Unknown sweep param {param!r}")
+        lo = float(axis.get("min", 0.5))
+        hi = float(axis.get("max", 1.5))
+        steps = int(axis.get("steps", 50))
+        if steps < 1 or lo > hi or lo < 0:
+            raise ValueError(f"Invalid range for {param}: need 0 <= min <= max and steps >= 1")
+        expanded.append({"param": param, "values": np.linspace(lo, hi, steps)})
+
+    params = [a["param"] for a in expanded]
+    if len(set(params)) != len(params):
+        raise ValueError("each parameter can only appear on one axis")
+    return expanded
+
+
+def _evaluate_chunk(
+    arrays: Dict[str, np.ndarray],
+    start: int,
+    stop: int,
+    origin: int,
+    shape: Tuple[int, ...],
+    columns: List[int],
+    values: List[np.ndarray],
+    base_row: np.ndarray,
+    key: BaselineKey,
+    base_rows: Dict[str, Any],
+    outputs: Sequence[str],
+    year: Optional[int],
+) -> None:
+    # Grid points start:stop, written at rows start - origin of `arrays`
+    grid_idx = np.unravel_index(np.arange(start, stop), shape)
+
+    rows = np.tile(base_row, (stop - start, 1))
+    for col, axis_values, idx in zip(columns, values, grid_idx):
+        rows[:, col] = axis_values[idx]
+
+    batch = compute_financials_batch(rows, baseline_for_key(key, base_rows))
+    for name in outputs:
+        arrays[name][start - origin : stop - origin] = evaluate_metric(batch, name, year)
+
+
+def sweep_chunks(
+    axes: Sequence[Dict[str, Any]],
+    base: Optional[Dict[str, Any]] = None,
+    outputs: Sequence[str] = DEFAULT_OUTPUTS,
+    year: Optional[int] = None,
+    chunk_size: int = 10_000,
+    fmt: ResponseFormat = ResponseFormat(),
+) -> Iterator[Dict[str, Any]]:
+    """
+    Evaluate the Cartesian grid of `axes` chunk by chunk.
+
+    Yields a "header" message (axis values, grid shape), then one "chunk"
+    message per block of grid points with the requested outputs flattened
+    in row-major (C) order starting at "offset", and finally "end". Large
+    grids are evaluated by the process pool (see parallel.py) a window of
+    a few chunks per worker at a time, small ones in-process one chunk at a
+    time, so memory stays bounded whatever the grid size. Chunk values are
+    encoded according to `fmt` (precision / binary encoding; field
+    projection does not apply).
+    """
+    expanded = sweep_axes(axes)
+    shape = tuple(len(a["values"]) for a in expanded)
+    total = int(np.prod(shape))
+    base_row = scales_matrix([base or {}])[0]
+    key = baseline_key(base or {})  # validated before the header goes out
+
+    yield {
+        "type": "header",
+        "axes": [{"param": a["param"], "values": a["values"].tolist()} for a in expanded],
+        "shape": list(shape),
+        "total": total,
+        "outputs": list(outputs),
+        "year": year,
+    }
+
+    shared = use_pool(total)
+    window = chunk_size * WORKERS * 4 if shared else chunk_size
+    options = {
+        "shape": shape,
+        "columns": [SCALE_KEYS.index(a["param"]) for a in expanded],
+        "values": [a["values"] for a in expanded],
+        "base_row": base_row,
+        "key": key,
+        "base_rows": source_rows(key[-1]),
+        "outputs": list(outputs),
+        "year": year,
+    }
+    for origin in range(0, total, window):
+        end = min(origin + window, total)
+        shapes = {name: (end - origin,) for name in outputs}
+        with SharedArrays(shapes, shared) as out:
+            chunks = map_chunks(
+                _evaluate_chunk, out, origin, end, chunk_size, origin=origin, **options
+            )
+            for start, stop in chunks:
+                yield {
+                    "type": "chunk",
+                    "offset": start,
+                    "count": stop - start,
+                    "values": {
+                        name: encode_array(out[name][start - origin : stop - origin], fmt)
+                        for name in outputs
+                    },
+                }
+
+    yield {"type": "end", "total": total}
@@ -0,0 +1,20 @@
+// Node side of test_local_model_parity.py: reads [{spec, params, server}]
+// cases on stdin and prints the mismatches found by compareWithServer as
+// a JSON list of {params, mismatches}.
+const path = require("path");
+const { evaluateModel, evaluateReasonabilityLocal, compareWithServer } = require(
+    path.join(__dirname, "..", "static", "js", "local_model.js")
+);
+
+let input = "";
+process.stdin.on("data", chunk => { input += chunk; });
+process.stdin.on("end", () => {
+    const failures = [];
+    for (const c of JSON.parse(input)) {
+        const local = evaluateModel(c.spec, c.params);
+        const colors = evaluateReasonabilityLocal(c.spec, local);
+        const mismatches = compareWithServer(local, colors, c.server);
+        if (mismatches.length) failures.push({ params: c.params, mismatches: mismatches.slice(0, 5) });
+    }
+    process.stdout.write(JSON.stringify(failures));
+});
@@ -0,0 +1,316 @@
+from typing import Dict, Any
+
+import numpy as np
+import pytest
+
+from financial_engine import (
+    BASE_CONV_CERT,
+    BASE_CONV_GAME,
+    BASE_CONV_PREMIUM,
+    BASE_CONV_SMALL,
+    BASE_COST_FORMATION,
+    BASE_COST_GAME_DEV,
+    BASE_COST_HW,
+    BASE_COST_PRICES,
+    BASE_COST_SPACE_OPS,
+    BASE_COST_SPACE_SYSTEM,
+    BASE_COST_WEB3,
+    BASE_MARKETING_COMPONENTS,
+    BASE_MAU,
+    BASE_REV_FORMATION,
+    BASE_REV_GAME,
+    BASE_REV_XR,
+    BASE_SALARIES,
+    BASE_STAFF_COUNT,
+    RECURRENCY,
+    SCALE_KEYS,
+    SPACE_MIN_PROFIT,
+    YEARS,
+    _get_scale,
+    compute_financials,
+)
+
+# Max |compute_financials - reference| per series, relative to the series' magnitude
+TOLERANCE = 1e-12
+
+
+def reference_financials(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reference financial engine: the Excel rows written out year by year.
+
+    compute_financials evaluates the same model through the precomputed
+    coefficient tables, in a different operation order, so the two agree
+    to rounding: about 1e-14 of each series' magnitude (elementwise up to
+    ~3e-12 relative in years where profit nearly cancels).
+
+    params comes from the frontend and typically contains:
+      - mau_scale
+      - conv_game_scale
+      - conv_course_scale
+      - marketing_scale
+      - event_yield_scale
+      - content_cost_scale
+      - staff_scale
+      - srv_hw_scale
+    """
+
+    mau_scale = _get_scale(params, "mau_scale", 1.0)
+    conv_game_scale = _get_scale(params, "conv_game_scale", 1.0)
+    conv_course_scale = _get_scale(params, "conv_course_scale", 1.0)
+    marketing_scale = _get_scale(params, "marketing_scale", 1.0)
+    event_yield_scale = _get_scale(params, "event_yield_scale", 1.0)
+    content_cost_scale = _get_scale(params, "content_cost_scale", 1.0)
+    staff_scale = _get_scale(params, "staff_scale", 1.0)
+    srv_hw_scale = _get_scale(params, "srv_hw_scale", 1.0)
+
+    # === 1) Scale core drivers ===
+
+    mau = [base * mau_scale for base in BASE_MAU]
+
+    # Game conversion & course conversion — we just scale ratios
+    conv_game = [c * conv_game_scale for c in BASE_CONV_GAME]
+    conv_premium = BASE_CONV_PREMIUM  # kept as-is, used in CAC paying
+    conv_small = [c * conv_course_scale for c in BASE_CONV_SMALL]
+    conv_cert = [c * conv_course_scale for c in BASE_CONV_CERT]
+
+    # Marketing components
+    mkt_events = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["events"]]
+    mkt_sponsors = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["sponsors"]]
+    mkt_travels = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["travels"]]
+    mkt_publicity = [v * marketing_scale for v in BASE_MARKETING_COMPONENTS["publicity"]]
+
+    marketing_total = [
+        mkt_events[i]
+        + mkt_sponsors[i]
+        + mkt_travels[i]
+        + mkt_publicity[i]
+        for i in range(len(YEARS))
+    ]
+
+    # Event yields (XR + D revenues)
+    rev_xr = [BASE_REV_XR[i] * event_yield_scale for i in range(len(YEARS))]
+
+    # Formation/content costs
+    cost_formation = [BASE_COST_FORMATION[i] * content_cost_scale for i in range(len(YEARS))]
+
+    # Salaries & staff
+    staff = [BASE_STAFF_COUNT[i] * staff_scale for i in range(len(YEARS))]
+    cost_salaries = [BASE_SALARIES[i] * staff_scale for i in range(len(YEARS))]
+
+    # Services & HW: derived from base HW cost, scaled by both staff & srv_hw scale
+    cost_hw = [
+        BASE_COST_HW[i] * staff_scale * srv_hw_scale for i in range(len(YEARS))
+    ]
+
+    # Web3 costs, game dev (kept fixed except content scaling could be added later)
+    cost_web3 = BASE_COST_WEB3[:]
+    cost_game_dev = BASE_COST_GAME_DEV[:]
+
+    # === 2) Revenues, calibrated to keep Excel numbers at 1x ===
+
+    game_rev: List[float] = []
+    formation_rev: List[float] = []
+
+    for i in range(len(YEARS)):
+        base_m = BASE_MAU[i]
+        base_g = BASE_REV_GAME[i]
+        base_f = BASE_REV_FORMATION[i]
+
+        if base_m > 0:
+            # Effective revenue per MAU at baseline
+            rev_per_m_game = base_g / base_m
+            rev_per_m_form = base_f / base_m
+
+            # Scale with both MAU and the respective conversion sliders
+            game_rev.append(mau[i] * rev_per_m_game * conv_game_scale)
+            formation_rev.append(mau[i] * rev_per_m_form * conv_course_scale)
+        else:
+            game_rev.append(0.0)
+            formation_rev.append(0.0)
+
+    revenues = [
+        game_rev[i] + formation_rev[i] + rev_xr[i]
+        for i in range(len(YEARS))
+    ]
+
+    # === 3) Space system costs driven by profitability (≥ 5M rule) ===
+
+    space_cost_used: List[float] = []
+    profit_before_space: List[float] = []
+    total_costs: List[float] = []
+    profit: List[float] = []
+
+    for i in range(len(YEARS)):
+        # Costs that do NOT depend on the profit rule
+        cost_marketing_i = marketing_total[i]
+        cost_salaries_i = cost_salaries[i]
+        cost_hw_i = cost_hw[i]
+        cost_web3_i = cost_web3[i]
+        cost_game_dev_i = cost_game_dev[i]
+        cost_formation_i = cost_formation[i]
+        cost_prices_i = BASE_COST_PRICES[i]
+
+        # Sum partial costs (without space system & ops)
+        partial_costs = (
+            cost_marketing_i
+            + cost_salaries_i
+            + cost_hw_i
+            + cost_web3_i
+            + cost_game_dev_i
+            + cost_formation_i
+            + cost_prices_i
+        )
+
+        profit_before = revenues[i] - partial_costs
+
+        # Planned space system + ops cost from Excel
+        planned_space = BASE_COST_SPACE_SYSTEM[i] + BASE_COST_SPACE_OPS[i]
+
+        if profit_before <= SPACE_MIN_PROFIT:
+            # Not enough margin to sustain space system: invest 0 that year
+            space_used = 0.0
+        else:
+            # Invest up to what keeps profit >= 5M
+            max_affordable = profit_before - SPACE_MIN_PROFIT
+            space_used = min(planned_space, max_affordable)
+
+        total_cost_i = partial_costs + space_used
+        profit_i = revenues[i] - total_cost_i
+
+        profit_before_space.append(profit_before)
+        space_cost_used.append(space_used)
+        total_costs.append(total_cost_i)
+        profit.append(profit_i)
+
+    # === 4) CAC metrics (total & paying) ===
+
+    new_users_raw: List[float] = []
+    new_paying_users: List[float] = []
+    cac_total: List[float] = []
+    cac_paying: List[float] = []
+
+    for i in range(len(YEARS)):
+        if i == 0:
+            prev_mau = 0.0
+        else:
+            prev_mau = mau[i - 1]
+
+        # New users after accounting for recurrency (simplified adaptation of row 126)
+        new_users = max(mau[i] - prev_mau * RECURRENCY, 0.0)
+        new_users_raw.append(new_users)
+
+        # Rough paying ratio = sum of the 4 conversion types
+        paying_ratio = conv_game[i] + conv_premium[i] + conv_small[i] + conv_cert[i]
+        paying_ratio = min(max(paying_ratio, 0.0), 1.0)
+
+        new_paying = new_users * paying_ratio
+        new_paying_users.append(new_paying)
+
+        # Acquisition spend: we tie CAC to marketing budget
+        acq_spend = marketing_total[i]
+
+        if new_users > 0:
+            cac_total.append(acq_spend / new_users)
+        else:
+            cac_total.append(0.0)
+
+        if new_paying > 0:
+            cac_paying.append(acq_spend / new_paying)
+        else:
+            cac_paying.append(0.0)
+
+    # For reasonability & charts we expose "cac" as CAC per paying customer
+    cac_for_charts = cac_paying
+
+    # === 5) ROAS ===
+
+    roas: List[float] = []
+    for i in range(len(YEARS)):
+        mkt = marketing_total[i]
+        if mkt > 0:
+            roas.append(revenues[i] / mkt)
+        else:
+            roas.append(0.0)
+
+    # === 6) Build debug table (one row per year) ===
+
+    debug_table: List[Dict[str, float]] = []
+    for idx, year in enumerate(YEARS):
+        debug_table.append(
+            {
+                "year": year,
+                "mau": mau[idx],
+                "game_revenue": game_rev[idx],
+                "formation_revenue": formation_rev[idx],
+                "xr_revenue": rev_xr[idx],
+                "total_revenue": revenues[idx],
+                "marketing_total": marketing_total[idx],
+                "salaries": cost_salaries[idx],
+                "services_hw": cost_hw[idx],
+                "web3_cost": cost_web3[idx],
+                "game_dev_cost": cost_game_dev[idx],
+                "formation_cost": cost_formation[idx],
+                "prices_cost": BASE_COST_PRICES[idx],
+                "space_cost_used": space_cost_used[idx],
+                "total_cost": total_costs[idx],
+                "profit_before_space": profit_before_space[idx],
+                "profit": profit[idx],
+                "new_users": new_users_raw[idx],
+                "new_paying_users": new_paying_users[idx],
+                "cac_total": cac_total[idx],
+                "cac_paying": cac_paying[idx],
+                "roas": roas[idx],
+                "staff": staff[idx],
+            }
+        )
+
+    # === 7) Final results payload ===
+
+    return {
+        "years": YEARS,
+        "mau": mau,
+        "revenues": revenues,
+        "costs": total_costs,
+        "profit": profit,
+        "staff": staff,
+        "roas": roas,
+        "cac": cac_for_charts,          # CAC per paying customer
+        "cac_total": cac_total,         # CAC per new user
+        "cac_paying": cac_paying,       # explicit alias
+        "game_revenue": game_rev,
+        "formation_revenue": formation_rev,
+        "xr_revenue": rev_xr,
+        "marketing_total": marketing_total,
+        "space_cost_used": space_cost_used,
+        "profit_before_space": profit_before_space,
+        "debug_table": debug_table,
+    }
+
+
+def _scenarios():
+    draws = np.random.default_rng(1).uniform(0.0, 3.0, (500, len(SCALE_KEYS)))
+    scenarios = [dict(zip(SCALE_KEYS, row)) for row in draws.tolist()]
+    return scenarios + [{}, {"mau_scale": 0}, {"marketing_scale": 0}, {"staff_scale": "x"}]
+
+
+@pytest.mark.parametrize("params", _scenarios())
+def test_engine_matches_reference(params):
+    expected = reference_financials(params)
+    got = compute_financials(params)
+    assert got.keys() == expected.keys()
+    for key, values in expected.items():
+        if key == "debug_table":
+            continue
+        want = np.asarray(values, dtype=float)
+        scale = max(np.abs(want).max(), 1.0)
+        assert np.abs(np.asarray(got[key], dtype=float) - want).max() <= TOLERANCE * scale, key
+    for row, want in zip(got["debug_table"], expected["debug_table"]):
+        assert row.keys() == want.keys()
+
+
+def test_debug_table_is_optional():
+    params = {"mau_scale": 1.3, "staff_scale": 0.7}
+    full = compute_financials(params)
+    lean = compute_financials(params, debug_table=False)
+    assert "debug_table" not in lean
+    assert lean == {key: value for key, value in full.items() if key != "debug_table"}
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app import app
+from financial_engine import compute_financials
+from live_session import LiveSession
+from metrics import to_json_list
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize("body", [[1], "x", 3])
+def test_non_object_body_is_rejected(client, body):
+    assert client.post("/live/sessions", json=body).status_code == 400
+
+
+def test_unsupported_params_are_rejected(client):
+    response = client.post("/live/sessions", json={"mau_scale": 2, "granularity": "monthly"})
+    assert response.status_code == 400
+    assert "granularity" in response.get_json()["error"]
+    assert client.post("/live/sessions", json={"horizon": 0}).status_code == 400
+
+
+def test_baseline_params_match_run_model():
+    params = {
+        "mau_scale": 1.4,
+        "horizon": 20,
+        "extrapolation": {"mau": {"rule": "growth", "rate": 0.05}},
+        "retention": {"curve": "power", "alpha": 0.5},
+    }
+    session = LiveSession(params)
+    session.submit({"marketing_scale": 0.5})
+    session.next_update(0)
+
+    expected = compute_financials(dict(params, marketing_scale=0.5))
+    snapshot = session.snapshot()
+    assert snapshot["years"] == expected["years"]
+    for name in ("mau", "revenues", "costs", "profit", "cac_paying"):
+        assert snapshot["series"][name] == to_json_list(np.asarray(expected[name])), name
+    assert snapshot["params"]["horizon"] == 20
@@ -0,0 +1,45 @@
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from financial_engine import SCALE_KEYS, compute_financials
+from model_spec import model_spec
+from reasonability import evaluate_reasonability
+
+NODE = shutil.which("node")
+SCRIPT = os.path.join(os.path.dirname(__file__), "local_model_parity.js")
+
+BASES = [
+    {},
+    {"horizon": 6},
+    {"horizon": 30, "extrapolation": {"mau": {"rule": "growth", "rate": 0.05}}},
+    {"retention": {"curve": "power", "alpha": 0.6}},
+]
+
+
+def _scenarios(base, n, seed):
+    draws = np.random.default_rng(seed).uniform(0.0, 3.0, (n, len(SCALE_KEYS)))
+    scenarios = [dict(base, **dict(zip(SCALE_KEYS, row))) for row in draws.tolist()]
+    # Edge cases of the scale normalization and of the non-linear rules
+    scenarios += [dict(base), dict(base, mau_scale=0), dict(base, marketing_scale=0.0)]
+    return scenarios
+
+
+@pytest.mark.skipif(NODE is None, reason="node is not installed")
+@pytest.mark.parametrize("base", BASES, ids=lambda b: json.dumps(b, sort_keys=True))
+def test_local_model_matches_server(base):
+    spec = json.loads(json.dumps(model_spec(base)))  # as served by /model_spec
+    cases = []
+    for params in _scenarios(base, 100, seed=BASES.index(base)):
+        results = compute_financials(params)
+        server = {"results": results, "reasonability": evaluate_reasonability(results)}
+        cases.append({"spec": spec, "params": params, "server": json.loads(json.dumps(server))})
+
+    out = subprocess.run(
+        [NODE, SCRIPT], input=json.dumps(cases), capture_output=True, text=True, check=True
+    )
+    assert json.loads(out.stdout) == []
@@ -0,0 +1,61 @@
+import numpy as np
+
+from financial_engine import MODEL_GRAPH, SCALE_KEYS, model_state, scale_inputs
+from formula_graph import FormulaGraph, GraphState, Row
+from live_session import LiveSession
+
+PARAMS = {"mau_scale": 1.3, "marketing_scale": 0.8, "staff_scale": 1.1}
+
+
+def test_graph_state_runs_only_downstream_formulas():
+    calls = []
+
+    def counted(name, deps, formula):
+        return Row(name, deps, lambda *args: calls.append(name) or formula(*args))
+
+    graph = FormulaGraph(
+        ["a", "b", "c"],
+        [
+            counted("ab", ("a", "b"), lambda a, b: a + b),
+            counted("bc", ("b", "c"), lambda b, c: b * c),
+            counted("total", ("ab", "bc"), lambda x, y: x + y),
+        ],
+    )
+    state = GraphState(graph, {"a": 1, "b": 2, "c": 3})
+    calls.clear()
+
+    assert state.update({"a": 5, "b": 2}) == ["ab", "total"]
+    assert calls == ["ab", "total"]
+    assert state.values["total"] == 5 + 2 + 2 * 3
+    assert state.update({"a": 5}) == []
+
+
+def test_marketing_update_reuses_upstream_arrays():
+    state = model_state(PARAMS)
+    before = dict(state.values)
+
+    rerun = state.update(scale_inputs(dict(PARAMS, marketing_scale=1.7)))
+
+    assert set(rerun) == MODEL_GRAPH.downstream(["marketing_scale"])
+    upstream = [row.name for row in MODEL_GRAPH.order if row.name not in rerun]
+    for name in ("mau", "revenues", "salaries", "services_hw", "new_users", "paying_ratio"):
+        assert name in upstream
+    for name in upstream:
+        assert state.values[name] is before[name], name
+
+    fresh = MODEL_GRAPH.evaluate(scale_inputs(dict(PARAMS, marketing_scale=1.7)))
+    for name in rerun:
+        assert np.array_equal(state.values[name], fresh[name]), name
+
+
+def test_live_session_update_matches_fresh_session():
+    session = LiveSession(PARAMS)
+    session.snapshot()
+    session.submit({"marketing_scale": 2.5, "srv_hw_scale": 0.0})
+    update = session.next_update(0)
+
+    fresh = LiveSession(dict(PARAMS, marketing_scale=2.5, srv_hw_scale=0.0)).snapshot()
+    assert set(update["series"]) <= MODEL_GRAPH.downstream(["marketing_scale", "srv_hw_scale"])
+    assert session.snapshot()["series"] == fresh["series"]
+    assert session.snapshot()["reasonability"] == fresh["reasonability"]
+    assert list(fresh["params"]) == SCALE_KEYS
@@ -0,0 +1,46 @@
+import numpy as np
+
+import app as server
+from financial_engine import MODEL_GRAPH, batch_from_graph, get_baseline, graph_inputs
+from monthly import MONTHS, compute_financials_monthly_batch, monthly_baseline, rollup
+
+PARAMS = {"seasonality": {"game": "gaming", "marketing": "events"}, "horizon": 6}
+
+
+def _scales(n):
+    return np.random.default_rng(0).uniform(0.0, 2.0, (n, 8))
+
+
+def test_chunked_batch_matches_single_pass():
+    baseline = monthly_baseline(PARAMS)
+    scales = _scales(50)
+    monthly, annual = compute_financials_monthly_batch(scales, baseline, chunk_size=50)
+    chunked_monthly, chunked_annual = compute_financials_monthly_batch(scales, baseline, chunk_size=7)
+
+    for name in monthly:
+        assert np.array_equal(chunked_monthly[name], monthly[name]), name
+    for name in annual:
+        assert np.array_equal(chunked_annual[name], annual[name]), name
+
+
+def test_rollup_sums_months():
+    baseline = monthly_baseline(PARAMS)
+    values = MODEL_GRAPH.evaluate(graph_inputs(_scales(5), baseline))
+    batch = batch_from_graph(values, 5)
+    annual = rollup(values, baseline, 5)
+
+    blocks = batch["revenues"].reshape(5, baseline.horizon, MONTHS)
+    assert np.allclose(annual["revenues"], blocks.sum(axis=2), rtol=1e-12)
+    assert np.allclose(annual["mau"], batch["mau"].reshape(blocks.shape).mean(axis=2), rtol=1e-12)
+    # Fixed cost rows are (periods,) in the graph and broadcast in the roll-up
+    assert annual["services_hw"].shape == (5, baseline.horizon)
+    assert np.allclose(annual["services_hw"], batch["services_hw"].reshape(blocks.shape).sum(axis=2))
+
+
+def test_monthly_batches_are_budgeted_per_month():
+    cells = 120 * len(get_baseline().period_labels)
+    with server.app.app_context():
+        assert server._over_budget(120, get_baseline(), cells, "scenarios") is None
+        _, status = server._over_budget(120, monthly_baseline(), cells, "scenarios")
+        assert status == 413
+        assert server._over_budget(120 // MONTHS, monthly_baseline(), cells, "scenarios") is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from financial_engine import (
+    SCALE_KEYS,
+    compute_financials,
+    compute_financials_batch,
+    get_baseline,
+)
+from reasonability import decode_colors, evaluate_reasonability, evaluate_reasonability_batch
+
+
+def _batch_colors(batch):
+    return {name: decode_colors(c[0]) for name, c in evaluate_reasonability_batch(batch).items()}
+
+
+def _scenarios():
+    draws = np.random.default_rng(2).uniform(0.0, 3.0, (300, len(SCALE_KEYS)))
+    scenarios = [dict(zip(SCALE_KEYS, row)) for row in draws.tolist()]
+    return scenarios + [
+        {"mau_scale": 0},
+        {"staff_scale": 0},
+        {"marketing_scale": 0},
+        {"horizon": 40, "extrapolation": {"mau": {"rule": "decay", "rate": 0.3}}},
+    ]
+
+
+@pytest.mark.parametrize("params", _scenarios())
+def test_single_row_path_matches_batch(params):
+    batch = compute_financials_batch([params], get_baseline(params))
+    assert evaluate_reasonability(compute_financials(params)) == _batch_colors(batch)
+
+
+def test_short_and_missing_series_are_zero_padded():
+    results = {
+        "years": [1, 2, 3],
+        "mau": [float("nan"), 0.0, 1e6],
+        "revenues": [1.0, 0.5],
+        "staff": [0, 1, -1],
+    }
+    batch = {key: np.asarray([v + [0.0] * (3 - len(v))]) for key, v in results.items()}
+    batch["years"] = np.asarray(results["years"])
+    assert evaluate_reasonability(results) == _batch_colors(batch)
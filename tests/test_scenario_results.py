@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import app as server
+import reasonability
+from scenario_store import ScenarioStore
+
+ALL_GREEN = {
+    "version": 2,
+    "metrics": {"roas": {"value": "roas", "bands": [{"green": [[None, None]]}]}},
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "_scenario_store", ScenarioStore(str(tmp_path / "scenarios.db")))
+    yield server.app.test_client()
+    reasonability.load_rules()
+
+
+def _worst_color(client, name):
+    listing = client.get("/scenarios").get_json()["scenarios"]
+    return next(item["summary"]["worst_color"] for item in listing if item["name"] == name)
+
+
+def test_reloaded_rules_refresh_stored_colors(client, tmp_path, monkeypatch):
+    saved = client.post("/save_scenario", json={"name": "base", "mau_scale": 1.0}).get_json()
+    assert saved["summary"]["worst_color"] == "red"
+    assert _worst_color(client, "base") == "red"
+
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps(ALL_GREEN))
+    monkeypatch.setattr(reasonability, "RULES_PATH", str(rules))
+    assert client.post("/reasonability_rules/reload").status_code == 200
+
+    assert _worst_color(client, "base") == "green"
+    assert client.get("/scenarios?worst_color=red").get_json()["total"] == 0
+    results = client.post("/scenario_results", json={"name": "base"}).get_json()
+    assert list(results["reasonability"]) == ["roas"]
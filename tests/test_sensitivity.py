@@ -0,0 +1,23 @@
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize("base", [[1], "x", 3])
+def test_non_object_base_is_rejected(client, base):
+    response = client.post("/sensitivity", json={"base": base})
+    assert response.status_code == 400
+    assert "base" in response.get_json()["error"]
+
+
+def test_null_base_uses_default_scenario(client):
+    response = client.post("/sensitivity", json={"base": None, "params": ["mau_scale"]})
+    assert response.status_code == 200
+    assert response.get_json() == client.post(
+        "/sensitivity", json={"base": {}, "params": ["mau_scale"]}
+    ).get_json()
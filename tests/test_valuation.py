@@ -0,0 +1,27 @@
+import pytest
+
+import app as server
+from valuation import DEFAULT_DISCOUNT_RATE, valuation_options
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+@pytest.mark.parametrize("key", ["discount_rate", "initial_cash"])
+def test_non_finite_options_are_rejected(key, value):
+    with pytest.raises(ValueError, match="finite"):
+        valuation_options({key: value})
+
+
+def test_defaults():
+    assert valuation_options({}) == {"discount_rate": DEFAULT_DISCOUNT_RATE, "initial_cash": 0.0}
+
+
+def test_nan_discount_rate_is_a_bad_request():
+    client = server.app.test_client()
+    response = client.post(
+        "/run_model", data='{"discount_rate": NaN}', content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert "finite" in response.get_json()["error"]
+
+    response = client.post("/run_batch?discount_rate=nan", json=[{}])
+    assert response.status_code == 400
@@ -0,0 +1,155 @@
+import math
+from typing import Dict, Any
+
+import numpy as np
+
+# Investor metrics over yearly cash flows (the profit series), one value per
+# scenario row. The first year is undiscounted (t = 0), so npv(irr) == 0.
+# As in metrics.py, NaN means "never happened" and is serialized as null.
+
+DEFAULT_DISCOUNT_RATE = 0.10
+
+# Keys of valuation()
+VALUATION_METRICS = ("npv", "irr", "payback_year", "max_burn", "runway")
+
+# IRR search range for log(1 + rate): rates from -0.999 to 9999
+_IRR_BOUNDS = (np.log(1e-3), np.log(1e4))
+_IRR_TOL = 1e-12
+_IRR_MAX_ITER = 100
+# Plain bisection steps before Newton takes over: from the wide initial
+# bracket Newton tends to crawl along the flat part of the NPV curve
+_IRR_BISECTIONS = 6
+
+
+def _rows(cash_flows: Any) -> np.ndarray:
+    return np.atleast_2d(np.asarray(cash_flows, dtype=float))
+
+
+def discount_factors(periods: int, rate: float) -> np.ndarray:
+    if rate <= -1.0:
+        raise ValueError("discount_rate must be > -1")
+    return (1.0 + rate) ** -np.arange(periods, dtype=float)
+
+
+def npv(cash_flows: Any, rate: float = DEFAULT_DISCOUNT_RATE) -> np.ndarray:
+    cf = _rows(cash_flows)
+    return cf @ discount_factors(cf.shape[1], rate)
+
+
+def _polynomial(cf: np.ndarray, x: np.ndarray):
+    # Horner evaluation of sum(cf[:, t] x^t) and its derivative in x
+    value = cf[:, -1].copy()
+    slope = np.zeros_like(value)
+    for t in range(cf.shape[1] - 2, -1, -1):
+        slope = slope * x + value
+        value = value * x + cf[:, t]
+    return value, slope
+
+
+def irr(cash_flows: Any) -> np.ndarray:
+    """
+    Internal rate of return of every row at once.
+
+    Safeguarded Newton on u = log(1 + rate) inside a bracket that always
+    holds a sign change of the NPV, after a few bisection steps and
+    whenever a Newton step leaves the bracket; every row advances in the
+    same vectorized iterations. NaN where the NPV does not change sign over the search
+    range (no IRR, or an even number of them).
+    """
+    cf = _rows(cash_flows)
+    n = cf.shape[0]
+    lo = np.full(n, _IRR_BOUNDS[0])
+    hi = np.full(n, _IRR_BOUNDS[1])
+    f_lo, _ = _polynomial(cf, np.exp(-lo))
+    f_hi, _ = _polynomial(cf, np.exp(-hi))
+    valid = np.sign(f_lo) * np.sign(f_hi) < 0
+
+    u = (lo + hi) / 2
+    for iteration in range(_IRR_MAX_ITER):
+        x = np.exp(-u)
+        f, slope = _polynomial(cf, x)
+        # Keep the half of the bracket where the sign change is
+        same = np.sign(f) == np.sign(f_lo)
+        lo = np.where(same, u, lo)
+        f_lo = np.where(same, f, f_lo)
+        hi = np.where(same, hi, u)
+
+        derivative = -x * slope  # d npv / d u
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = u - f / derivative
+        bisect = ~((step >= lo) & (step <= hi)) | (iteration < _IRR_BISECTIONS)
+        new_u = np.where(bisect, (lo + hi) / 2, step)
+
+        converged = (np.abs(new_u - u) <= _IRR_TOL) | (f == 0)
+        u = np.where(f == 0, u, new_u)
+        if converged[valid].all():
+            break
+
+    return np.where(valid, np.expm1(u), np.nan)
+
+
+def discounted_cumulative(cash_flows: Any, rate: float = DEFAULT_DISCOUNT_RATE) -> np.ndarray:
+    cf = _rows(cash_flows)
+    return np.cumsum(cf * discount_factors(cf.shape[1], rate), axis=1)
+
+
+def payback_period(cash_flows: Any, rate: float = DEFAULT_DISCOUNT_RATE) -> np.ndarray:
+    """Index of the first period with positive discounted cumulative cash flow."""
+    positive = discounted_cumulative(cash_flows, rate) > 0
+    return np.where(positive.any(axis=1), np.argmax(positive, axis=1), np.nan)
+
+
+def max_burn(cash_flows: Any) -> np.ndarray:
+    """Deepest cumulative loss (0 if cumulative cash never goes below zero)."""
+    return np.maximum(-np.cumsum(_rows(cash_flows), axis=1).min(axis=1), 0.0)
+
+
+def runway(cash_flows: Any, initial_cash: float = 0.0) -> np.ndarray:
+    """
+    Periods fully funded by initial_cash: index of the first period whose
+    closing cash balance is negative, NaN if the cash never runs out.
+    """
+    balance = initial_cash + np.cumsum(_rows(cash_flows), axis=1)
+    short = balance < 0
+    return np.where(short.any(axis=1), np.argmax(short, axis=1), np.nan)
+
+
+def valuation(
+    batch: Dict[str, np.ndarray],
+    discount_rate: float = DEFAULT_DISCOUNT_RATE,
+    initial_cash: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Valuation metrics of every scenario of a compute_financials_batch
+    result, from its yearly profit. payback_year is the year (not the index)
+    in which discounted cumulative profit turns positive; runway is in years.
+    """
+    profit = batch["profit"]
+    years = np.asarray(batch["years"], dtype=float)
+    payback = payback_period(profit, discount_rate)
+    payback_year = np.where(
+        np.isnan(payback), np.nan, years[np.nan_to_num(payback).astype(int)]
+    )
+    return {
+        "npv": npv(profit, discount_rate),
+        "irr": irr(profit),
+        "payback_year": payback_year,
+        "max_burn": max_burn(profit),
+        "runway": runway(profit, initial_cash),
+    }
+
+
+def valuation_options(data: Any) -> Dict[str, float]:
+    """discount_rate / initial_cash keyword arguments of valuation() from a request."""
+    try:
+        options = {
+            "discount_rate": float(data.get("discount_rate", DEFAULT_DISCOUNT_RATE)),
+            "initial_cash": float(data.get("initial_cash", 0.0)),
+        }
+    except (TypeError, ValueError):
+        raise ValueError("'discount_rate' and 'initial_cash' must be numbers") from None
+    if not all(math.isfinite(value) for value in options.values()):
+        raise ValueError("'discount_rate' and 'initial_cash' must be finite")
+    if options["discount_rate"] <= -1.0:
+        raise ValueError("discount_rate must be > -1")
+    return options
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, IO, Optional, Tuple
+
+import numpy as np
+
+# Baseline rows read from the "Hyp Financials" sheet of the model workbook
+# (.xlsx, parsed here with zipfile + ElementTree) and compiled into a
+# (rows, years) float64 matrix. The matrix is cached as a .npy file named
+# after the workbook's sha256, so a restart or a reload of an unchanged
+# workbook maps the cached file instead of parsing the XML again.
+
+SHEET_NAME = "Hyp Financials"
+
+# Sheet columns of YEARS 1..14
+YEAR_COLUMNS = tuple(chr(c) for c in range(ord("G"), ord("T") + 1))
+
+# financial_engine.BASE_ROWS name -> sheet row
+SHEET_ROWS: Dict[str, int] = {
+    "mau": 5,
+    "conv_game": 12,
+    "conv_premium": 16,
+    "conv_small": 33,
+    "conv_cert": 36,
+    "rev_game": 11,
+    "rev_formation": 32,
+    "rev_xr": 40,
+    "salaries": 66,
+    "staff_count": 79,
+    "cost_hw": 81,
+    "cost_web3": 97,
+    "cost_game_dev": 102,
+    "cost_formation": 104,
+    "cost_space_system": 110,
+    "cost_space_ops": 111,
+    "cost_prices": 113,
+    "marketing_events": 122,
+    "marketing_sponsors": 123,
+    "marketing_travels": 124,
+    "marketing_publicity": 125,
+}
+
+# Bumped whenever the compiled layout changes; the cache file name also
+# covers the sheet, rows and columns read, so editing them recompiles
+CACHE_FORMAT = 1
+CACHE_DIR = os.environ.get("BASELINE_CACHE_DIR", "data/baseline_cache")
+
+_LAYOUT = hashlib.sha256(
+    repr((CACHE_FORMAT, SHEET_NAME, sorted(SHEET_ROWS.items()), YEAR_COLUMNS)).encode("utf-8")
+).hexdigest()[:8]
+
+
+def workbook_digest(path: str) -> str:
+    """sha256 of the workbook file (hex)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _local(tag: str) -> str:
+    # Transitional and strict OOXML use different namespaces for the same tags
+    return tag.rsplit("}", 1)[-1]
+
+
+def _sheet_path(archive: zipfile.ZipFile, sheet: str) -> str:
+    """Archive member of the worksheet named `sheet` (via workbook.xml and its rels)."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rel_id = None
+    for element in workbook.iter():
+        if _local(element.tag) == "sheet" and element.get("name") == sheet:
+            rel_id = next(v for k, v in element.attrib.items() if _local(k) == "id")
+            break
+    if rel_id is None:
+        raise ValueError(f"Workbook has no sheet named {sheet!r}")
+
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError(f"Sheet {sheet!r} has no worksheet part")
+
+
+def _cell_value(cell: ET.Element, ref: str) -> float:
+    kind = cell.get("t", "n")
+    value = None
+    has_formula = False
+    for child in cell:
+        name = _local(child.tag)
+        if name == "v":
+            value = child.text
+        elif name == "f":
+            has_formula = True
+
+    if value is None:
+        if has_formula:
+            raise ValueError(f"Cell {ref} has a formula but no cached value (recalculate and save)")
+        return 0.0  # blank cells read as 0, as in Excel formulas
+    if kind == "n":
+        return float(value)
+    if kind == "b":
+        return float(value == "1")
+    if kind == "e":
+        raise ValueError(f"Cell {ref} holds the error {value}")
+    raise ValueError(f"Cell {ref} is not numeric")
+
+
+def _read_cells(sheet_xml: IO[bytes]) -> Dict[Tuple[int, str], float]:
+    """(row, column) -> value of the SHEET_ROWS × YEAR_COLUMNS cells present in the sheet."""
+    wanted_rows = set(SHEET_ROWS.values())
+    wanted_columns = set(YEAR_COLUMNS)
+    last_row = max(wanted_rows)
+    cells: Dict[Tuple[int, str], float] = {}
+    row_number = 0
+
+    # Streamed, and each row is dropped once read: the sheet may be large
+    for _, element in ET.iterparse(sheet_xml, events=("end",)):
+        if _local(element.tag) != "row":
+            continue
+        row_number = int(element.get("r", row_number + 1))
+        if row_number in wanted_rows:
+            for cell in element:
+                ref = cell.get("r", "")
+                column = ref.rstrip("0123456789")
+                if column in wanted_columns:
+                    cells[row_number, column] = _cell_value(cell, ref)
+        element.clear()
+        if row_number >= last_row:
+            break
+    return cells
+
+
+def parse_workbook(path: str, sheet: str = SHEET_NAME) -> np.ndarray:
+    """
+    The SHEET_ROWS of `sheet` as a (len(SHEET_ROWS), len(YEAR_COLUMNS))
+    float64 matrix, in SHEET_ROWS order. Formulas contribute the value
+    cached by the last save; missing cells read as 0.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(_sheet_path(archive, sheet)) as sheet_xml:
+                cells = _read_cells(sheet_xml)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as exc:
+        raise ValueError(f"Not a readable .xlsx workbook: {exc}") from None
+
+    matrix = np.zeros((len(SHEET_ROWS), len(YEAR_COLUMNS)))
+    for i, row in enumerate(SHEET_ROWS.values()):
+        for j, column in enumerate(YEAR_COLUMNS):
+            matrix[i, j] = cells.get((row, column), 0.0)
+    return matrix
+
+
+def _cache_path(digest: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{digest}-{_LAYOUT}.npy")
+
+
+def _load_compiled(path: str) -> Optional[np.ndarray]:
+    try:
+        matrix = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None  # missing, truncated or unreadable: recompile
+    if matrix.shape != (len(SHEET_ROWS), len(YEAR_COLUMNS)) or matrix.dtype != np.float64:
+        return None
+    return matrix
+
+
+def _save_compiled(path: str, matrix: np.ndarray) -> None:
+    # Written aside and renamed, so concurrent loaders never map a partial file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def compile_workbook(path: str, cache_dir: Optional[str] = None) -> Tuple[str, np.ndarray]:
+    """
+    (workbook sha256, compiled matrix): memory-mapped from the cache when
+    this workbook was compiled before, otherwise parsed and cached. A cache
+    directory that cannot be written only costs the parse next time.
+    """
+    digest = workbook_digest(path)
+    cached = _cache_path(digest, cache_dir or CACHE_DIR)
+    matrix = _load_compiled(cached)
+    if matrix is None:
+        matrix = parse_workbook(path)
+        try:
+            _save_compiled(cached, matrix)
+        except OSError:
+            pass
+    return digest, matrix
+
+
+def load_workbook_rows(
+    path: str, cache_dir: Optional[str] = None
+) -> Tuple[str, Dict[str, np.ndarray]]:
+    """(workbook sha256, {BASE_ROWS name: per-year values}) of a workbook."""
+    digest, matrix = compile_workbook(path, cache_dir)
+    return digest, {name: matrix[i] for i, name in enumerate(SHEET_ROWS)}